@@ -0,0 +1,146 @@
+"""Bytes per event and encode/decode speed of the log row formats.
+
+Builds --events synthetic rows shaped like the ones `Monitor.save_log`
+spools (one meeting, a few detectors, mostly safe results one second
+apart) and splits them into batches of --batch-size, the spool replay
+chunk size. Then, per format:
+
+  ndjson  helpers.spool.encode_row / decode_row, what the spool and the
+          NDJSON ingestion body carry today
+  binary  helpers.codec.encode_rows / decode_rows
+
+it reports bytes per event raw and gzip-compressed as HttpTransport sends
+them, and encode/decode microseconds per event. For memory it compares
+one event held as a row dict, a codec.LogEvent and a models.db.UserLogs
+ORM object, and how long building each takes.
+
+    cd app && python -m benchmarks.codec --events 100000
+"""
+import gc
+import json
+import gzip
+import time
+import random
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+from helpers import codec
+from helpers.spool import encode_row, decode_row
+from models.db import UserLogs
+
+
+DETECTORS = {
+    "cheating_software": ["✅ Cheating software in not running", "❌ Cluely is running", "❌ Cluely, Interview Coder are running"],
+    "browser": ["✅ Zoom tab is active", "⚠️ Left the Zoom tab", "⚠️ Navigated away from the meeting"],
+}
+
+
+def make_rows(count, danger_rate):
+    started_at = datetime(2026, 1, 1, 9, 0)
+    rows = []
+    for log_id in range(1, count + 1):
+        detector = random.choice(list(DETECTORS))
+        messages = DETECTORS[detector]
+        risky = random.random() < danger_rate
+        logged_at = started_at + timedelta(seconds=log_id, microseconds=random.randint(0, 999999))
+        repeat_count = 1 if risky else random.randint(1, 30)
+        rows.append({
+            "user_id": "test-user",
+            "user_fingerprint": "test-fingerprint",
+            "meeting_id": "6810523567",
+            "log_id": log_id,
+            "detector": detector,
+            "log": random.choice(messages[1:]) if risky else messages[0],
+            "activity_status": ("danger" if detector == "cheating_software" else "warning") if risky else "safe",
+            "repeat_count": repeat_count,
+            "logged_at": logged_at,
+            "last_logged_at": logged_at + timedelta(seconds=repeat_count - 1) if repeat_count > 1 else None,
+            "created_at": logged_at + timedelta(seconds=repeat_count, milliseconds=random.randint(0, 50)),
+        })
+    return rows
+
+
+def ndjson_encode(batch):
+    return "".join(encode_row(row) + "\n" for row in batch).encode("utf-8")
+
+def ndjson_decode(data):
+    return [decode_row(line) for line in data.decode("utf-8").splitlines()]
+
+
+def timed(function, items):
+    started_at = time.perf_counter()
+    results = [function(item) for item in items]
+    return results, time.perf_counter() - started_at
+
+
+def measure_format(encode, decode, batches, events):
+    bodies, encode_time = timed(encode, batches)
+    _, decode_time = timed(decode, bodies)
+    raw = sum(len(body) for body in bodies)
+    compressed = sum(len(gzip.compress(body, 6)) for body in bodies)
+    return {
+        "bytes_per_event": round(raw / events, 1),
+        "gzip_bytes_per_event": round(compressed / events, 1),
+        "encode_us_per_event": round(encode_time / events * 1e6, 2),
+        "decode_us_per_event": round(decode_time / events * 1e6, 2),
+    }
+
+
+def measure_objects(build, rows):
+    _, elapsed = timed(build, rows)
+    # a second pass for memory, tracemalloc slows down allocation too much to time it
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(row) for row in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    # the field values are shared with `rows`, so this is the per-object overhead
+    return {
+        "bytes_per_event": round(size / len(rows), 1),
+        "build_us_per_event": round(elapsed / len(rows) * 1e6, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--danger-rate", type=float, default=0.02, help="share of risky results")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rows = make_rows(args.events, args.danger_rate)
+    batches = [rows[start:start + args.batch_size] for start in range(0, len(rows), args.batch_size)]
+
+    decoded = [row for batch in batches for row in codec.decode_rows(codec.encode_rows(batch))]
+    if decoded != rows:
+        raise SystemExit("binary round trip does not reproduce the rows")
+
+    result = {
+        "benchmark": "codec",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "codec_version": codec.VERSION,
+        "events": args.events,
+        "batch_size": args.batch_size,
+        "formats": {
+            "ndjson": measure_format(ndjson_encode, ndjson_decode, batches, args.events),
+            "binary": measure_format(codec.encode_rows, codec.decode_rows, batches, args.events),
+        },
+        "objects": {
+            "dict": measure_objects(dict, rows),
+            "log_event": measure_objects(codec.LogEvent.from_row, rows),
+            "orm": measure_objects(lambda row: UserLogs(**row), rows),
+        },
+    }
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
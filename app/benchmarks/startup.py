@@ -0,0 +1,210 @@
+"""Measure a monitoring session's startup up to the first detector check.
+
+Runs the real `Monitor.monitor` path --runs times: Chrome launch, the
+DevToolsActivePort and /json/version polling, the Playwright connect and
+page load, the device fingerprint wait, the browser watcher and the
+scheduler's first `CheatingSoftwareDetector` run with the real process
+watcher. Chrome is `benchmarks.stub_cdp`, which boots after --boot-delay
+seconds and serves the meeting page after --page-delay seconds, so no
+browser is needed.
+
+The stub has no WebSocket endpoint, so `async_playwright` is replaced by
+StubPlaywright: connecting fetches /json/version, `goto` fetches the
+stub's /meeting page, and the browser sends no events. That swaps out
+Playwright's own protocol work, not anything in this repo. The device
+fingerprint is collected cold, into a cache file of its own per run.
+
+Reports per run when each StartupTimer phase finished (chrome_launched,
+cdp_ready, cdp_connected, page_loaded, first_check) and the overhead:
+first_check minus the stub's boot and page delays. Prints JSON and exits
+with status 1 when the median overhead is above --max-overhead, so CI can
+catch regressions without a real browser.
+
+    cd app && python -m benchmarks.startup --runs 10 --boot-delay 0.5 --page-delay 0.2
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import argparse
+import statistics
+import urllib.request
+from urllib.parse import urlsplit
+import monitor
+from monitor import Monitor
+from helpers.fingerprint import DeviceFingerprint
+from helpers.process_watcher import ProcessWatcher
+
+
+PHASES = ("chrome_launched", "cdp_ready", "cdp_connected", "page_loaded", "first_check")
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.read()
+
+
+# ---- Playwright stand-in --------------------------------------------
+class StubCDPSession:
+    def on(self, event, callback):
+        pass
+
+    async def send(self, method, params=None):
+        return {}
+
+    async def detach(self):
+        pass
+
+
+class StubPage:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.url = "about:blank"
+        self.main_frame = object()
+
+    def on(self, event, callback):
+        pass
+
+    async def goto(self, url, wait_until=None):
+        # the stub serves the meeting page, whatever host the monitor was given
+        await asyncio.to_thread(fetch, self.endpoint + urlsplit(url).path)
+        self.url = url
+
+
+class StubContext:
+    def __init__(self, page):
+        self.pages = [page]
+
+
+class StubBrowser:
+    def __init__(self, endpoint):
+        self.contexts = [StubContext(StubPage(endpoint))]
+
+    async def new_browser_cdp_session(self):
+        return StubCDPSession()
+
+    async def close(self):
+        pass
+
+
+class StubPlaywright:
+    """Stands in for `async_playwright()` against the stub CDP server."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    @property
+    def chromium(self):
+        return self
+
+    async def connect_over_cdp(self, endpoint):
+        await asyncio.to_thread(fetch, endpoint + "/json/version")
+        return StubBrowser(endpoint)
+
+
+# ---- Session --------------------------------------------------------
+class BufferSink:
+    def __init__(self):
+        self.rows = []
+
+    def put(self, row):
+        self.rows.append(row)
+        return True
+
+
+class StartupManager:
+    """The parts of SessionManager a Monitor uses, with the real process watcher and fingerprint."""
+
+    def __init__(self, fingerprint_cache):
+        self.log_sink = BufferSink()
+        self.process_watcher = ProcessWatcher(Monitor.CHEATING_SOFTWARE)
+        self.stop_event = asyncio.Event()
+        self.log_id = 0
+        self.fingerprint = None
+        self.fingerprint_task = asyncio.ensure_future(asyncio.to_thread(DeviceFingerprint(fingerprint_cache).get))
+        self.statuses = []
+
+    async def device_fingerprint(self):
+        self.fingerprint = await self.fingerprint_task
+        return self.fingerprint
+
+    def next_log_id(self):
+        self.log_id += 1
+        return self.log_id
+
+    def post_status(self, session, text):
+        self.statuses.append(text)
+
+
+class StubMonitor(Monitor):
+    def __init__(self, manager, meeting_id, boot_delay, page_delay):
+        super().__init__(manager, meeting_id, meeting_url="http://stub/meeting", url_prefix="http://stub/meeting")
+        self.boot_delay = boot_delay
+        self.page_delay = page_delay
+
+    def chrome_command(self):
+        return [
+            sys.executable, "-m", "benchmarks.stub_cdp",
+            "--remote-debugging-address=127.0.0.1", "--remote-debugging-port=0",
+            f"--user-data-dir={self.user_data_dir}",
+            f"--boot-delay={self.boot_delay}", f"--page-delay={self.page_delay}",
+        ]
+
+
+async def measure(boot_delay, page_delay, timeout):
+    work_dir = tempfile.mkdtemp(prefix="startup_bench_")
+    manager = StartupManager(os.path.join(work_dir, "fingerprint.json"))
+    session = StubMonitor(manager, f"startup-bench-{os.getpid()}", boot_delay, page_delay)
+    task = asyncio.ensure_future(session.run())
+    try:
+        deadline = time.monotonic() + timeout
+        while not (session.startup_timer and "first_check" in session.startup_timer.marks):
+            if task.done():
+                raise RuntimeError(f"Monitor stopped before its first check: {manager.statuses[-1:]}")
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"No first check within {timeout}s")
+            await asyncio.sleep(0.005)
+    finally:
+        manager.stop_event.set()
+        await task
+        manager.process_watcher.close()
+        shutil.rmtree(session.user_data_dir, ignore_errors=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return session.startup_timer.as_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--boot-delay", type=float, default=0.5, help="seconds the stub waits before listening")
+    parser.add_argument("--page-delay", type=float, default=0.2, help="seconds the stub takes to serve the meeting page")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the first check per run")
+    parser.add_argument("--max-overhead", type=float, default=0.5, help="allowed median seconds over boot and page delay")
+    args = parser.parse_args()
+
+    monitor.async_playwright = StubPlaywright
+    runs = [asyncio.run(measure(args.boot_delay, args.page_delay, args.timeout)) for _ in range(args.runs)]
+    overheads = [run["first_check"] - args.boot_delay - args.page_delay for run in runs]
+    result = {
+        "benchmark": "chrome_startup",
+        "runs": runs,
+        "boot_delay": args.boot_delay,
+        "page_delay": args.page_delay,
+        **{f"{phase}_p50": round(statistics.median(run[phase] for run in runs), 4) for phase in PHASES},
+        "first_check_max": round(max(run["first_check"] for run in runs), 4),
+        "overhead_p50": round(statistics.median(overheads), 4),
+        "max_overhead": args.max_overhead,
+    }
+    result["passed"] = result["overhead_p50"] <= args.max_overhead
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
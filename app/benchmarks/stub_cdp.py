@@ -0,0 +1,72 @@
+"""Stand-in for Chrome's remote debugging HTTP endpoint.
+
+Takes the same debugging flags the monitor passes to Chrome. Waits
+`--boot-delay` seconds (like a browser starting up), then serves
+/json/version and /json/list until killed, and /meeting as the page the
+monitor navigates to, answered after `--page-delay` seconds. With port 0
+it picks a free port and writes it to DevToolsActivePort in
+`--user-data-dir`, as Chrome does. There is no WebSocket endpoint;
+benchmarks.startup drives the monitor with a stand-in for Playwright.
+
+    python -m benchmarks.stub_cdp --remote-debugging-port=0 --user-data-dir=/tmp/p --boot-delay=1.5
+"""
+import os
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubCDPHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        port = self.server.server_address[1]
+        path = self.path.rstrip("/")
+        if path == "/json/version":
+            body = {
+                "Browser": "StubChrome/0.0",
+                "Protocol-Version": "1.3",
+                "webSocketDebuggerUrl": f"ws://127.0.0.1:{port}/devtools/browser/stub",
+            }
+        elif path in ("/json", "/json/list"):
+            body = []
+        elif path == "/meeting":
+            time.sleep(self.server.page_delay)
+            self.send_body(b"<html><body>Stub meeting</body></html>", "text/html")
+            return
+        else:
+            self.send_error(404)
+            return
+        self.send_body(json.dumps(body).encode(), "application/json")
+
+    def send_body(self, data, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--remote-debugging-port", type=int, required=True)
+    parser.add_argument("--remote-debugging-address", default="127.0.0.1")
+    parser.add_argument("--user-data-dir")
+    parser.add_argument("--boot-delay", type=float, default=0)
+    parser.add_argument("--page-delay", type=float, default=0)
+    args, _ = parser.parse_known_args()
+
+    time.sleep(args.boot_delay)
+    server = ThreadingHTTPServer((args.remote_debugging_address, args.remote_debugging_port), StubCDPHandler)
+    server.page_delay = args.page_delay
+    if args.user_data_dir:
+        port = server.server_address[1]
+        with open(os.path.join(args.user_data_dir, "DevToolsActivePort"), "w") as f:
+            f.write(f"{port}\n/devtools/browser/stub\n")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure how long the desktop app takes to show its window.
+
+Starts the app --runs times with MEETING_APP_STARTUP_FILE set; the app then
+writes the wall-clock time its window was first mapped to that file and
+quits (see `App.report_startup`). Time-to-window is that time minus the
+moment the process was spawned, so interpreter start, imports and Tk setup
+are all included. Measures `meeting_app.py` under this interpreter by
+default, or the packaged build with --exe:
+
+    cd app && python -m benchmarks.time_to_window --runs 10
+    cd app && python -m benchmarks.time_to_window --exe dist/meeting_app
+
+Needs a display. Prints JSON and exits with status 1 when the median is
+above --max-seconds.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import statistics
+import subprocess
+
+
+APP_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "meeting_app.py")
+
+
+def measure(command, timeout):
+    work_dir = tempfile.mkdtemp(prefix="meeting_app_startup_")
+    startup_file = os.path.join(work_dir, "window_shown")
+    env = {**os.environ, "MEETING_APP_STARTUP_FILE": startup_file}
+    try:
+        spawned_at = time.time()
+        # the app writes app.log into its working directory, keep that out of the checkout
+        process = subprocess.Popen(command, cwd=work_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise RuntimeError(f"No window within {timeout}s: {command}")
+        if not os.path.exists(startup_file):
+            raise RuntimeError(f"App exited ({process.returncode}) without showing a window: {command}")
+        with open(startup_file) as f:
+            return float(f.read()) - spawned_at
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--exe", help="packaged app to start instead of meeting_app.py")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the window per run")
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="allowed median time-to-window")
+    args = parser.parse_args()
+
+    command = [os.path.abspath(args.exe)] if args.exe else [sys.executable, APP_SCRIPT]
+    runs = [round(measure(command, args.timeout), 4) for _ in range(args.runs)]
+    result = {
+        "benchmark": "time_to_window",
+        "command": command,
+        "runs": runs,
+        "time_to_window_p50": round(statistics.median(runs), 4),
+        "time_to_window_max": max(runs),
+        "max_seconds": args.max_seconds,
+    }
+    result["passed"] = result["time_to_window_p50"] <= args.max_seconds
+    print(json.dumps(result, indent=2))
+    sys.exit(0 if result["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
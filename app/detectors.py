@@ -0,0 +1,21 @@
+from helpers.scheduler import Detector
+
+
+class CheatingSoftwareDetector(Detector):
+    """Reports whether any blocklisted process is running."""
+    name = "cheating_software"
+    period = 2 # 2sec
+    budget = 0.2 # 200ms
+    jitter = 0.2 # 200ms
+
+    def __init__(self, monitor, **kwargs):
+        super().__init__(**kwargs)
+        self.monitor = monitor
+
+    def check(self):
+        # sync on purpose: the scheduler runs it in a worker thread
+        detected = self.monitor.process_watcher.scan()
+        if detected:
+            names = ", ".join(self.monitor.CHEATING_SOFTWARE[software] for software in sorted(detected))
+            return self.monitor.ACTIVITY_STATUS_DANGER, f"❌ {names} {'is' if len(detected) == 1 else 'are'} running"
+        return self.monitor.ACTIVITY_STATUS_SAFE, "✅ Cheating software in not running"
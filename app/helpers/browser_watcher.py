@@ -0,0 +1,77 @@
+import logging
+
+
+class BrowserWatcher:
+    """Reports navigation and tab changes from Playwright/CDP events.
+
+    Nothing is polled: navigation and close events of the monitored page come
+    from Playwright, and tabs opened or closed anywhere in the browser come from
+    CDP `Target.targetCreated`/`Target.targetDestroyed` on a browser-level
+    session. `on_event(watcher, activity_status, message)` is called on the
+    event loop from inside the Playwright event dispatch, so it has to be quick.
+    """
+    name = "browser"
+
+    def __init__(self, browser, page, url_prefix, on_event, safe_status, warning_status):
+        self.browser = browser
+        self.page = page
+        self.url_prefix = url_prefix
+        self.on_event = on_event
+        self.safe_status = safe_status
+        self.warning_status = warning_status
+        self.cdp = None
+        self.tabs = {} # CDP targetId -> url, for every open page target
+        self.on_meeting_page = True
+
+    async def start(self):
+        self.page.on("framenavigated", self._on_navigated)
+        self.page.on("close", self._on_page_close)
+
+        self.cdp = await self.browser.new_browser_cdp_session()
+        self.cdp.on("Target.targetCreated", self._on_target_created)
+        self.cdp.on("Target.targetDestroyed", self._on_target_destroyed)
+        # replays targetCreated for the tabs that are already open
+        await self.cdp.send("Target.setDiscoverTargets", {"discover": True})
+
+    async def stop(self):
+        if self.cdp:
+            try:
+                await self.cdp.detach()
+            except Exception as e:
+                logging.debug(f"CDP session detach failed: {e}")
+            self.cdp = None
+
+    def _on_navigated(self, frame):
+        if frame != self.page.main_frame:
+            return
+        on_meeting_page = frame.url.startswith(self.url_prefix)
+        if on_meeting_page == self.on_meeting_page:
+            return
+        self.on_meeting_page = on_meeting_page
+        if on_meeting_page:
+            self.on_event(self, self.safe_status, "✅ Zoom page open")
+        else:
+            self.on_event(self, self.warning_status, "⚠️ URL changed")
+
+    def _on_page_close(self, page):
+        self.on_event(self, self.warning_status, "❌ Zoom page closed")
+
+    def _on_target_created(self, event):
+        target = event["targetInfo"]
+        if target.get("type") != "page":
+            return
+        self.tabs[target["targetId"]] = target.get("url", "")
+        if len(self.tabs) > 1:
+            self.on_event(self, self.warning_status, f"⚠️ Extra browser tab opened ({len(self.tabs)} tabs)")
+
+    def _on_target_destroyed(self, event):
+        if self.tabs.pop(event["targetId"], None) is None:
+            return
+        if not self.tabs:
+            self.on_event(self, self.warning_status, "❌ No open browser pages")
+        elif len(self.tabs) == 1:
+            # the extra tabs are gone, report the remaining page's state again
+            if self.on_meeting_page:
+                self.on_event(self, self.safe_status, "✅ Only the Zoom tab is open")
+            else:
+                self.on_event(self, self.warning_status, "⚠️ URL changed")
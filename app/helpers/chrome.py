@@ -0,0 +1,119 @@
+import os
+import sys
+import time
+import shutil
+import json
+import asyncio
+import logging
+import subprocess
+import urllib.error
+import urllib.request
+
+
+DEVTOOLS_PORT_FILE = "DevToolsActivePort"
+
+
+class StartupTimer:
+    """Records how long after session start each startup phase finished."""
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started_at = clock()
+        self.marks = {} # phase -> seconds since start
+
+    def mark(self, phase):
+        if phase in self.marks:
+            return
+        self.marks[phase] = round(self.clock() - self.started_at, 4)
+        logging.info(f"Startup phase {phase} done after {self.marks[phase]}s")
+
+    def as_dict(self):
+        return dict(self.marks)
+
+
+def find_chrome_executable():
+    candidates = []
+    if sys.platform == "darwin":  # macOS
+        candidates = [
+            "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+        ]
+    elif sys.platform.startswith("win"):  # Windows
+        candidates = [
+            os.path.expandvars(r"%ProgramFiles%\Google\Chrome\Application\chrome.exe"),
+            os.path.expandvars(r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe"),
+            os.path.expandvars(r"%LocalAppData%\Google\Chrome\Application\chrome.exe"),
+        ]
+
+    for c in candidates:
+        path = shutil.which(c) if not os.path.isabs(c) else (c if os.path.exists(c) else None)
+        if path:
+            return path
+
+    raise Exception("Chrome executable not found")
+
+
+def launch_chrome(command):
+    process = subprocess.Popen(command)
+    logging.info(f"Chrome launched, pid {process.pid}")
+    return process
+
+
+def read_devtools_port(user_data_dir):
+    """Return the CDP port Chrome wrote to DevToolsActivePort, or None if it has not yet.
+
+    Chrome started with `--remote-debugging-port=0` picks a free port itself
+    and records it as the first line of this file in its profile directory.
+    """
+    try:
+        with open(os.path.join(user_data_dir, DEVTOOLS_PORT_FILE)) as f:
+            port = f.readline().strip()
+    except FileNotFoundError:
+        return None
+    return int(port) if port.isdigit() else None
+
+
+def _fetch_cdp_version(port):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=1) as response:
+            return json.load(response)
+    except (urllib.error.URLError, ConnectionError, TimeoutError, ValueError):
+        return None
+
+
+async def poll(probe, what, timeout=30, process=None, stop_event=None, initial_delay=0.05, max_delay=0.25):
+    """Call `probe` in a worker thread until it returns something other than None.
+
+    Retries with exponential backoff from `initial_delay` up to `max_delay`
+    seconds between attempts. Returns the probe result, or None if
+    `stop_event` was set first. Raises if `process` exits or `timeout` passes.
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    while True:
+        result = await asyncio.to_thread(probe)
+        if result is not None:
+            return result
+
+        if process and process.poll() is not None:
+            raise Exception(f"Chrome exited with code {process.returncode} before {what}")
+        if time.monotonic() + delay > deadline:
+            raise Exception(f"Timed out after {timeout}s waiting for {what}")
+
+        if stop_event:
+            try:
+                await asyncio.wait_for(stop_event.wait(), delay)
+                return None
+            except asyncio.TimeoutError:
+                pass
+        else:
+            await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+async def wait_for_devtools_port(user_data_dir, **kwargs):
+    return await poll(lambda: read_devtools_port(user_data_dir), "DevToolsActivePort", **kwargs)
+
+
+async def wait_for_cdp(port, **kwargs):
+    """Poll the CDP `/json/version` endpoint until Chrome answers and return the version info."""
+    return await poll(lambda: _fetch_cdp_version(port), f"CDP endpoint on port {port}", **kwargs)
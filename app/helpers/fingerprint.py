@@ -0,0 +1,191 @@
+"""Device fingerprint for the `user_fingerprint` column.
+
+Hardware, OS, browser and display attributes are collected once, by one
+thread per collector, and hashed into a stable ID. Some collectors run
+a subprocess (ioreg, xrandr, system_profiler) and take up to a second or
+two, so the result is cached on disk together with an invalidation key
+made of cheap attributes: host name, OS build, MAC address and the
+Chrome binary's modification time. A cache whose key still matches and
+that is younger than MAX_AGE is reused as is.
+
+A collector that fails or times out contributes None, so a fingerprint
+is always available; it is just less specific. A result with a timed out
+collector is not cached, the next session tries again.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import hashlib
+import logging
+import platform
+import plistlib
+import subprocess
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import psutil
+from helpers.chrome import find_chrome_executable
+
+
+def _run(command, timeout=5):
+    return subprocess.run(command, capture_output=True, text=True, timeout=timeout, check=True).stdout
+
+
+# ---- Collectors -----------------------------------------------------
+def collect_machine_id():
+    if sys.platform.startswith("win"):
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography") as key:
+            return winreg.QueryValueEx(key, "MachineGuid")[0]
+    if sys.platform == "darwin":
+        for line in _run(["ioreg", "-rd1", "-c", "IOPlatformExpertDevice"]).splitlines():
+            if "IOPlatformUUID" in line:
+                return line.split("=")[-1].strip().strip('"')
+        return None
+    for path in ("/etc/machine-id", "/var/lib/dbus/machine-id"):
+        if os.path.exists(path):
+            with open(path) as f:
+                return f.read().strip()
+    return None
+
+def collect_hardware():
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "logical_cores": psutil.cpu_count(logical=True),
+        "memory_bytes": psutil.virtual_memory().total,
+        "mac": uuid.getnode(),
+    }
+
+def collect_os():
+    return {"system": platform.system(), "release": platform.release(), "version": platform.version()}
+
+def collect_browser():
+    """Chrome's major version, read from the install rather than by running Chrome."""
+    executable = find_chrome_executable()
+    if sys.platform == "darwin":
+        info_plist = os.path.join(os.path.dirname(os.path.dirname(executable)), "Info.plist")
+        with open(info_plist, "rb") as f:
+            version = plistlib.load(f)["CFBundleShortVersionString"]
+    elif sys.platform.startswith("win"):
+        # chrome.exe sits next to a directory named after its version
+        versions = [name for name in os.listdir(os.path.dirname(executable)) if name[:1].isdigit()]
+        version = max(versions, key=lambda name: [int(part) for part in name.split(".") if part.isdigit()])
+    else:
+        version = _run([executable, "--version"]).split()[-1]
+    # minor updates land every few weeks and would change the fingerprint each time
+    return {"name": "chrome", "major_version": version.split(".")[0]}
+
+def collect_display():
+    if sys.platform.startswith("win"):
+        import ctypes
+        user32 = ctypes.windll.user32
+        # SM_CXSCREEN, SM_CYSCREEN, SM_CMONITORS
+        return {"width": user32.GetSystemMetrics(0), "height": user32.GetSystemMetrics(1), "monitors": user32.GetSystemMetrics(80)}
+    if sys.platform == "darwin":
+        displays = json.loads(_run(["system_profiler", "SPDisplaysDataType", "-json"]))["SPDisplaysDataType"]
+        screens = [screen.get("_spdisplays_resolution") for gpu in displays for screen in gpu.get("spdisplays_ndrvs", [])]
+        return {"screens": sorted(filter(None, screens))}
+    if not shutil.which("xrandr") or not os.environ.get("DISPLAY"):
+        return None
+    screens = [line.split()[0] for line in _run(["xrandr", "--current"]).splitlines() if " connected" in line]
+    return {"screens": sorted(screens)}
+
+
+# ---- Fingerprint ----------------------------------------------------
+class DeviceFingerprint:
+    VERSION = 1 # bump when collectors change, so every cache is rebuilt
+    CACHE_PATH = os.path.join(os.path.expanduser("~"), ".meeting_app", "fingerprint.json")
+    MAX_AGE = timedelta(days=7)
+    COLLECT_TIMEOUT = 10 # 10sec, for all collectors together
+    COLLECTORS = {
+        "machine_id": collect_machine_id,
+        "hardware": collect_hardware,
+        "os": collect_os,
+        "browser": collect_browser,
+        "display": collect_display,
+    }
+
+    def __init__(self, cache_path=None, collectors=None):
+        self.cache_path = cache_path or self.CACHE_PATH
+        self.collectors = collectors or self.COLLECTORS
+
+    def get(self) -> str:
+        """Return the cached fingerprint, collecting it again when the cache is stale."""
+        key = self.invalidation_key()
+        cached = self.read_cache()
+        if self.is_fresh(cached, key):
+            return cached["fingerprint"]
+
+        attributes, complete = self.collect()
+        fingerprint = self.hash(attributes)
+        logging.info(f"Device fingerprint collected: {fingerprint}")
+        if not complete:
+            return fingerprint
+        self.write_cache({
+            "key": key,
+            "fingerprint": fingerprint,
+            "attributes": attributes,
+            "collected_at": datetime.now().isoformat(timespec="seconds"),
+        })
+        return fingerprint
+
+    def is_fresh(self, cached, key) -> bool:
+        try:
+            return cached["key"] == key and datetime.now() - datetime.fromisoformat(cached["collected_at"]) < self.MAX_AGE
+        except (TypeError, KeyError, ValueError):
+            return False
+
+    def invalidation_key(self) -> str:
+        try:
+            chrome_mtime = os.path.getmtime(find_chrome_executable())
+        except Exception:
+            chrome_mtime = None
+        parts = [self.VERSION, platform.node(), platform.platform(), uuid.getnode(), chrome_mtime]
+        return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+    def collect(self):
+        """Run every collector in parallel and return (attributes, complete)."""
+        executor = ThreadPoolExecutor(max_workers=len(self.collectors), thread_name_prefix="fingerprint")
+        futures = {name: executor.submit(collector) for name, collector in self.collectors.items()}
+        deadline = time.monotonic() + self.COLLECT_TIMEOUT
+        attributes = {}
+        complete = True
+        for name, future in futures.items():
+            try:
+                attributes[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except TimeoutError:
+                logging.warning(f"Fingerprint collector {name} timed out")
+                attributes[name] = None
+                complete = False
+            except Exception as e:
+                logging.warning(f"Fingerprint collector {name} failed: {e}")
+                attributes[name] = None
+        # a collector stuck in a subprocess is left to its timeout instead of holding up the session
+        executor.shutdown(wait=False)
+        return attributes, complete
+
+    @staticmethod
+    def hash(attributes: dict) -> str:
+        canonical = json.dumps(attributes, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+    def read_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_cache(self, data):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logging.error(f"Could not cache the device fingerprint in {self.cache_path}: {e}")
@@ -0,0 +1,84 @@
+import logging
+import queue
+import threading
+import time
+from helpers import metrics
+
+
+class LogSink:
+    """Background writer that buffers log rows and stores them in batches.
+
+    `put` never does I/O: rows are queued in memory and a worker thread hands
+    them to `target.write(rows)` as soon as `batch_size` rows are waiting or
+    `flush_interval` seconds have passed since the first one.
+    """
+    BATCH_SIZE = 200
+    FLUSH_INTERVAL = 2 # 2sec
+    MAX_QUEUE_SIZE = 10000
+
+    def __init__(self, target, batch_size=None, flush_interval=None, max_queue_size=None):
+        self.target = target
+        self.batch_size = batch_size or self.BATCH_SIZE
+        self.flush_interval = flush_interval or self.FLUSH_INTERVAL
+        self.queue = queue.Queue(maxsize=max_queue_size or self.MAX_QUEUE_SIZE)
+        self.dropped = 0
+        self.thread = None
+        metrics.LOG_SINK_QUEUE.set_function(self.queue.qsize)
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10):
+        """Stop the worker after it has written everything queued so far."""
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def put(self, row: dict) -> bool:
+        """Queue a row for writing. Returns False if the buffer is full."""
+        try:
+            self.queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            metrics.LOG_SINK_DROPPED.inc()
+            logging.warning(f"Log sink buffer is full, dropped {self.dropped} rows so far")
+            return False
+
+    def _next_batch(self):
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if deadline is None:
+                timeout = self.flush_interval
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _run(self):
+        while not (self._stop.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self.flush(batch)
+
+    def flush(self, rows):
+        try:
+            with metrics.SPOOL_WRITE_DURATION.time():
+                self.target.write(rows)
+            logging.debug(f"Log sink flushed {len(rows)} rows")
+        except Exception as e:
+            logging.error(f"Log sink flush of {len(rows)} rows failed: {e}")
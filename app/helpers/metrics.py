@@ -0,0 +1,80 @@
+"""Prometheus metrics of the monitoring thread.
+
+Kept in a registry of their own and written to a local file by
+`StatsWriter` in the Prometheus text format, the same one node_exporter's
+textfile collector reads, so a station can be scraped without opening a
+port. Updating a metric is a lock and an addition; nothing is logged.
+"""
+import os
+import logging
+import threading
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, write_to_textfile
+
+
+# detectors are budgeted in tens of milliseconds, the default buckets start too coarse for them
+FAST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+registry = CollectorRegistry()
+
+DETECTOR_DURATION = Histogram(
+    "meeting_app_detector_duration_seconds", "Time one detector check took",
+    ["detector"], buckets=FAST_BUCKETS, registry=registry,
+)
+DETECTOR_ERRORS = Counter("meeting_app_detector_errors_total", "Detector checks that raised", ["detector"], registry=registry)
+DETECTOR_OVERRUNS = Counter("meeting_app_detector_overruns_total", "Detector checks over their budget", ["detector"], registry=registry)
+SCHEDULER_DRIFT = Histogram(
+    "meeting_app_scheduler_drift_seconds", "How late a detector check started after it was due",
+    ["detector"], buckets=FAST_BUCKETS, registry=registry,
+)
+DETECTOR_INTERVAL = Gauge(
+    "meeting_app_detector_interval_seconds", "Time until a detector's next check, as last chosen by the scheduler",
+    ["detector"], registry=registry,
+)
+CPU_PERCENT = Gauge("meeting_app_cpu_percent", "Machine CPU use the scheduler last sampled", registry=registry)
+LOG_SINK_QUEUE = Gauge("meeting_app_log_sink_queue_rows", "Rows waiting in the log sink buffer", registry=registry)
+LOG_SINK_DROPPED = Counter("meeting_app_log_sink_dropped_rows_total", "Rows dropped because the log sink buffer was full", registry=registry)
+SPOOL_WRITE_DURATION = Histogram(
+    "meeting_app_spool_write_seconds", "Time to append one log sink batch to the spool",
+    buckets=FAST_BUCKETS, registry=registry,
+)
+TRANSPORT_SEND_DURATION = Histogram("meeting_app_transport_send_seconds", "Time to store one spool chunk (database or HTTP)", registry=registry)
+TRANSPORT_FAILURES = Counter("meeting_app_transport_failures_total", "Spool chunks that could not be stored and are retried", registry=registry)
+
+
+class StatsWriter:
+    """Rewrites the stats file every `interval` seconds and once more on stop.
+
+    The file is replaced atomically, so a reader never sees half of it.
+    """
+    INTERVAL = 10 # 10sec
+
+    def __init__(self, path, interval=None):
+        self.path = path
+        self.interval = interval or self.INTERVAL
+        self.thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+        self.write()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            write_to_textfile(self.path, registry)
+        except OSError as e:
+            logging.error(f"Could not write stats to {self.path}: {e}")
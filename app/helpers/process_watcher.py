@@ -0,0 +1,183 @@
+import os
+import re
+import sys
+import time
+import socket
+import struct
+import threading
+import logging
+import psutil
+
+
+def compile_blocklist(patterns):
+    """Combine blocklist substrings into one case-insensitive regex.
+
+    Longer patterns go first so the most specific entry wins when several
+    of them match the same process name.
+    """
+    patterns = sorted({p.lower() for p in patterns}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(p) for p in patterns), re.IGNORECASE)
+
+
+class ProcConnector:
+    """Linux process events (fork/exec/exit) from the netlink proc connector.
+
+    Needs CAP_NET_ADMIN on most kernels; `open` returns None when the socket
+    cannot be set up so the caller can fall back to PID-set diffs.
+    """
+    NETLINK_CONNECTOR = 11
+    CN_IDX_PROC = 1
+    CN_VAL_PROC = 1
+    NLMSG_DONE = 3
+    PROC_CN_MCAST_LISTEN = 1
+    PROC_EVENT_FORK = 0x00000001
+    PROC_EVENT_EXEC = 0x00000002
+    PROC_EVENT_EXIT = 0x80000000
+    HEADER_SIZE = 16 + 20 # nlmsghdr + cn_msg
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.overrun = False
+
+    @classmethod
+    def open(cls):
+        if not sys.platform.startswith("linux"):
+            return None
+        sock = None
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, cls.NETLINK_CONNECTOR)
+            sock.bind((os.getpid(), cls.CN_IDX_PROC))
+            payload = struct.pack("=I", cls.PROC_CN_MCAST_LISTEN)
+            cn_msg = struct.pack("=IIIIHH", cls.CN_IDX_PROC, cls.CN_VAL_PROC, 0, 0, len(payload), 0) + payload
+            sock.send(struct.pack("=IHHII", 16 + len(cn_msg), cls.NLMSG_DONE, 0, 0, os.getpid()) + cn_msg)
+            sock.setblocking(False)
+            return cls(sock)
+        except OSError as e:
+            logging.info(f"Process events unavailable, using PID diff: {e}")
+            if sock:
+                sock.close()
+            return None
+
+    def read(self):
+        """Return pending (started, exited) PID sets without blocking."""
+        started, exited = set(), set()
+        while True:
+            try:
+                data = self.sock.recv(4096)
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS: the kernel dropped events, the index has to be rebuilt
+                self.overrun = True
+                break
+            if len(data) < self.HEADER_SIZE + 16:
+                continue
+            what, = struct.unpack_from("=I", data, self.HEADER_SIZE)
+            body = self.HEADER_SIZE + 16 # what, cpu, timestamp_ns
+            if what == self.PROC_EVENT_FORK:
+                _, _, child_pid, child_tgid = struct.unpack_from("=IIII", data, body)
+                if child_pid == child_tgid: # skip new threads
+                    started.add(child_tgid)
+            elif what == self.PROC_EVENT_EXEC:
+                # exec changes the name, so treat it like a new process
+                _, tgid = struct.unpack_from("=II", data, body)
+                started.add(tgid)
+            elif what == self.PROC_EVENT_EXIT:
+                pid, tgid = struct.unpack_from("=II", data, body)
+                if pid == tgid:
+                    exited.add(tgid)
+                    started.discard(tgid)
+        return started, exited
+
+    def close(self):
+        self.sock.close()
+
+
+class ProcessWatcher:
+    """Incremental scanner for blocklisted processes.
+
+    Keeps an index of known processes and only looks up names of PIDs that
+    appeared since the previous scan. New PIDs come from process-start events
+    where the OS offers them without extra privileges or dependencies (the
+    Linux proc connector, which also reports exec), otherwise from a diff of
+    `psutil.pids()`. That diff cannot see a PID that was reused, or a process
+    that exec'd into something else under its PID, between two scans, so a
+    full rescan runs every `FULL_RESCAN_INTERVAL` seconds, however long the
+    detector's period is. Processes are keyed by (pid, create_time), so a
+    rescan tells a reused PID from the process it replaced.
+    `scan` is thread-safe, so one watcher can serve several sessions.
+    """
+    FULL_RESCAN_INTERVAL = 60 # 1min
+
+    def __init__(self, blocklist, use_events=True, clock=time.monotonic):
+        self.pattern = compile_blocklist(blocklist)
+        self.processes = {} # pid -> (pid, create_time)
+        self.names = {} # (pid, create_time) -> process name
+        self.matches = {} # (pid, create_time) -> matched blocklist entry
+        self.events = ProcConnector.open() if use_events else None
+        self.clock = clock
+        self.last_full_scan = None
+        self.lock = threading.Lock()
+
+    def scan(self):
+        """Return the set of blocklist entries that are currently running."""
+        with self.lock:
+            return self._scan()
+
+    def _scan(self):
+        rescan_due = self.last_full_scan is None or self.clock() - self.last_full_scan >= self.FULL_RESCAN_INTERVAL
+        if rescan_due or (self.events and self.events.overrun):
+            self._full_scan()
+        elif self.events:
+            started, exited = self.events.read()
+            self._forget(exited)
+            self._examine(started)
+        else:
+            pids = set(psutil.pids())
+            known = set(self.processes)
+            self._forget(known - pids)
+            self._examine(pids - known)
+        return set(self.matches.values())
+
+    def _full_scan(self):
+        if self.events:
+            self.events.read() # drop queued events, the rescan supersedes them
+            self.events.overrun = False
+        self.last_full_scan = self.clock()
+        pids = psutil.pids()
+        self._forget(set(self.processes) - set(pids))
+        # names are read again too: exec keeps the PID and create_time
+        self._examine(pids)
+
+    def _forget(self, pids):
+        for pid in pids:
+            key = self.processes.pop(pid, None)
+            self.names.pop(key, None)
+            self.matches.pop(key, None)
+
+    def _examine(self, pids):
+        for pid in pids:
+            try:
+                process = psutil.Process(pid)
+                key = (pid, process.create_time())
+                name = process.name()
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                self._forget((pid,))
+                continue
+            except psutil.AccessDenied:
+                key, name = (pid, None), ""
+            if self.processes.get(pid) != key:
+                # a new process, or a reused PID: drop what the old one matched
+                self._forget((pid,))
+                self.processes[pid] = key
+            self.names[key] = name
+            match = self.pattern.search(name) if name else None
+            if match:
+                self.matches[key] = match.group(0).lower()
+            else:
+                self.matches.pop(key, None)
+
+    def close(self):
+        if self.events:
+            self.events.close()
+            self.events = None
@@ -0,0 +1,73 @@
+"""Opt-in sampling profiler.
+
+A daemon thread wakes every `interval` seconds, takes the stack of every
+other thread from `sys._current_frames()` and counts it. `stop` writes the
+counts in the collapsed-stack format (`thread;frame;frame count` per line)
+that flamegraph.pl and speedscope read. Nothing is traced between samples,
+so the profiled code runs at full speed; a 10ms interval costs about one
+stack walk per thread per 10ms. The sampler needs the GIL to take a
+sample, so busy pure-Python code shows up where it gives the GIL away
+(I/O, C calls); reach for py-spy when that bias matters.
+
+The same file lives in app/helpers and web/helpers; change both copies
+together (web/tests/test_shared_modules.py fails while they differ).
+"""
+import os
+import sys
+import logging
+import threading
+from collections import Counter
+
+
+class SamplingProfiler:
+    INTERVAL = 0.01 # 10ms
+    MAX_DEPTH = 100
+
+    def __init__(self, path, interval=None):
+        self.path = path
+        self.interval = interval or self.INTERVAL
+        self.samples = Counter()
+        self.thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self.thread.start()
+        logging.info(f"Sampling profiler started, every {self.interval * 1000:g}ms into {self.path}")
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+        self.write()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own_ident:
+                    self.samples[self._stack(thread_names.get(ident, str(ident)), frame)] += 1
+
+    def _stack(self, thread_name, frame):
+        frames = []
+        while frame is not None and len(frames) < self.MAX_DEPTH:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(reversed(frames))
+
+    def write(self):
+        try:
+            with open(self.path, "w") as f:
+                for stack, count in self.samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        except OSError as e:
+            logging.error(f"Could not write profile to {self.path}: {e}")
+            return
+        logging.info(f"Profile with {sum(self.samples.values())} samples written to {self.path}")
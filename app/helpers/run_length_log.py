@@ -0,0 +1,61 @@
+from datetime import datetime
+
+
+class RunState:
+    def __init__(self, activity_status, msg):
+        self.activity_status = activity_status
+        self.msg = msg
+        self.pending = 0 # repeats seen since the last persisted row
+        self.pending_first = None
+        self.pending_last = None
+
+
+class RunLengthLog:
+    """Turns a stream of detector results into transition and heartbeat rows.
+
+    The first result of a detector and every change of its (activity_status,
+    message) is emitted right away with a count of 1. Repeats of the current
+    state are only counted, and emitted as one heartbeat row with the count
+    and the time span they cover every `heartbeat_interval` seconds, when the
+    state changes, and on `flush`. Every check therefore stays accounted for
+    while a quiet session writes a handful of rows an hour.
+
+    `emit(detector_name, activity_status, msg, first_at, last_at, count)`
+    is called for each row.
+    """
+    HEARTBEAT_INTERVAL = 300 # 5min
+
+    def __init__(self, emit, heartbeat_interval=None, clock=datetime.now):
+        self.emit = emit
+        self.heartbeat_interval = heartbeat_interval or self.HEARTBEAT_INTERVAL
+        self.clock = clock
+        self.states = {} # detector name -> RunState
+
+    def record(self, detector_name, activity_status, msg):
+        """Count one result; returns True if it was a transition."""
+        now = self.clock()
+        state = self.states.get(detector_name)
+        if state and state.activity_status == activity_status and state.msg == msg:
+            if not state.pending:
+                state.pending_first = now
+            state.pending += 1
+            state.pending_last = now
+            if (now - state.pending_first).total_seconds() >= self.heartbeat_interval:
+                self._flush_state(detector_name, state)
+            return False
+
+        if state:
+            self._flush_state(detector_name, state)
+        self.states[detector_name] = RunState(activity_status, msg)
+        self.emit(detector_name, activity_status, msg, now, now, 1)
+        return True
+
+    def _flush_state(self, detector_name, state):
+        if state.pending:
+            self.emit(detector_name, state.activity_status, state.msg, state.pending_first, state.pending_last, state.pending)
+            state.pending = 0
+
+    def flush(self):
+        """Emit the repeats counted so far for every detector, e.g. on shutdown."""
+        for detector_name, state in self.states.items():
+            self._flush_state(detector_name, state)
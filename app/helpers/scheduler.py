@@ -0,0 +1,261 @@
+import os
+import time
+import heapq
+import asyncio
+import random
+import logging
+import itertools
+import psutil
+from helpers import metrics
+
+
+class Detector:
+    """Base class for a monitor check run by `Scheduler`.
+
+    `period` is the number of seconds between runs, `budget` is how long one
+    run may take before it counts as an overrun and `jitter` is the maximum
+    random delay added to each period so checks do not line up. `check`
+    returns None when there is nothing to record, or an
+    (activity_status, message) tuple. It may be a coroutine function; a plain
+    function is run in a worker thread so it cannot block the event loop.
+    """
+    name = "detector"
+    period = 1 # 1sec
+    budget = 0.1 # 100ms
+    jitter = 0
+
+    def __init__(self, period=None, budget=None, jitter=None):
+        if period is not None:
+            self.period = period
+        if budget is not None:
+            self.budget = budget
+        if jitter is not None:
+            self.jitter = jitter
+
+    def check(self):
+        raise NotImplementedError
+
+
+class DetectorStats:
+    def __init__(self):
+        self.runs = 0
+        self.errors = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.backoff = 1
+
+    def as_dict(self):
+        return {
+            "runs": self.runs,
+            "errors": self.errors,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "total_time": round(self.total_time, 6),
+            "avg_time": round(self.total_time / self.runs, 6) if self.runs else 0.0,
+            "max_time": round(self.max_time, 6),
+            "backoff": self.backoff,
+        }
+
+
+class AdaptiveRate:
+    """Scales detector periods with recent risk and machine load.
+
+    Right after a risky result every period is multiplied by `ALERT_FACTOR`
+    for `ALERT_HOLD` seconds, so a suspicious session is looked at more
+    closely. Once nothing risky has been seen for `CALM_AFTER` seconds
+    periods are stretched by `CALM_FACTOR`, or by `BUSY_FACTOR` while CPU
+    use is at or above `BUSY_CPU_PERCENT`, so a clean session on a loaded
+    machine costs little. Whatever the factors, a period stays within
+    [min_period, max_period].
+    """
+    ALERT_FACTOR = 0.5
+    ALERT_HOLD = 30 # 30sec
+    CALM_AFTER = 60 # 1min
+    CALM_FACTOR = 2
+    BUSY_FACTOR = 4
+    BUSY_CPU_PERCENT = 80
+    LOAD_INTERVAL = 5 # 5sec, how often CPU use is sampled
+    MIN_PERIOD = float(os.getenv("DETECTOR_MIN_PERIOD", 0.5)) # 500ms
+    MAX_PERIOD = float(os.getenv("DETECTOR_MAX_PERIOD", 30)) # 30sec
+
+    def __init__(self, min_period=None, max_period=None, clock=time.monotonic, cpu_percent=None):
+        self.min_period = min_period if min_period is not None else self.MIN_PERIOD
+        self.max_period = max_period if max_period is not None else self.MAX_PERIOD
+        self.clock = clock
+        self.cpu_percent = cpu_percent or (lambda: psutil.cpu_percent(interval=None))
+        self.cpu = 0.0
+        self.load_sampled_at = None
+        self.risk_at = None
+        self.started_at = clock()
+
+    def observe(self, risky):
+        if risky:
+            self.risk_at = self.clock()
+
+    def sample_load(self):
+        now = self.clock()
+        if self.load_sampled_at is None or now - self.load_sampled_at >= self.LOAD_INTERVAL:
+            self.cpu = self.cpu_percent()
+            self.load_sampled_at = now
+            metrics.CPU_PERCENT.set(self.cpu)
+
+    def factor(self):
+        now = self.clock()
+        if self.risk_at is not None and now - self.risk_at < self.ALERT_HOLD:
+            return self.ALERT_FACTOR
+        if now - (self.risk_at if self.risk_at is not None else self.started_at) < self.CALM_AFTER:
+            return 1
+        return self.BUSY_FACTOR if self.cpu >= self.BUSY_CPU_PERCENT else self.CALM_FACTOR
+
+    def period(self, base):
+        return min(max(base * self.factor(), self.min_period), self.max_period)
+
+
+class Scheduler:
+    """Runs detectors on their own periods from a heap of due times.
+
+    Due detectors are started as separate tasks, so slow I/O in one of them
+    does not hold up the others; a detector is rescheduled when its run
+    finishes, so it never overlaps with itself. A detector that takes longer
+    than its budget has its period multiplied by `BACKOFF_FACTOR` (up to
+    `MAX_BACKOFF`), and the multiplier decays again once runs fit the budget.
+    Slots missed because a run was late are skipped rather than run back to
+    back. With a `rate` (see `AdaptiveRate`) periods also follow risk and
+    load, and `observe` pulls pending checks in after a risky result.
+    """
+    BACKOFF_FACTOR = 2
+    MAX_BACKOFF = 16
+    STATS_INTERVAL = 60 # 1min
+    SHUTDOWN_TIMEOUT = 5 # 5sec, how long `run` waits for running detectors on stop
+
+    def __init__(self, on_result=None, clock=time.monotonic, rate=None):
+        self.on_result = on_result
+        self.clock = clock
+        self.rate = rate
+        self.heap = []
+        self.stats = {}
+        self.tasks = set()
+        self.counter = itertools.count()
+        self.wakeup = None
+        self.stats_logged_at = None
+
+    def register(self, detector):
+        if detector.name in self.stats:
+            raise ValueError(f"Detector already registered: {detector.name}")
+        self.stats[detector.name] = DetectorStats()
+        self._schedule(detector, self.clock())
+
+    def _schedule(self, detector, due):
+        heapq.heappush(self.heap, (due, next(self.counter), detector))
+        if self.wakeup:
+            self.wakeup.set()
+
+    def period(self, detector):
+        period = detector.period * self.stats[detector.name].backoff
+        if self.rate:
+            period = self.rate.period(period)
+        return period
+
+    def interval(self, detector):
+        interval = self.period(detector) + random.uniform(0, detector.jitter)
+        metrics.DETECTOR_INTERVAL.labels(detector.name).set(interval)
+        return interval
+
+    def observe(self, risky):
+        """Feed a result's risk to the rate and bring due times forward if periods shrank."""
+        if not self.rate:
+            return
+        factor = self.rate.factor()
+        self.rate.observe(risky)
+        if self.rate.factor() >= factor:
+            return
+        now = self.clock()
+        self.heap = [(min(due, now + self.interval(detector)), order, detector) for due, order, detector in self.heap]
+        heapq.heapify(self.heap)
+        if self.wakeup:
+            self.wakeup.set()
+
+    def start_pending(self):
+        """Start every detector that is due and return the time until the next one."""
+        now = self.clock()
+        while self.heap and self.heap[0][0] <= now:
+            due, _, detector = heapq.heappop(self.heap)
+            stats = self.stats[detector.name]
+            period = self.period(detector)
+            metrics.SCHEDULER_DRIFT.labels(detector.name).observe(now - due)
+            if now - due >= period:
+                stats.skipped += int((now - due) // period)
+
+            task = asyncio.create_task(self._run_detector(detector), name=f"detector-{detector.name}")
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+        return max(self.heap[0][0] - now, 0) if self.heap else None
+
+    async def _run_detector(self, detector):
+        stats = self.stats[detector.name]
+        started_at = self.clock()
+        try:
+            if asyncio.iscoroutinefunction(detector.check):
+                result = await detector.check()
+            else:
+                result = await asyncio.to_thread(detector.check)
+        except Exception as e:
+            stats.errors += 1
+            metrics.DETECTOR_ERRORS.labels(detector.name).inc()
+            result = None
+            logging.error(f"Detector {detector.name} failed: {e}")
+        duration = self.clock() - started_at
+
+        stats.runs += 1
+        stats.total_time += duration
+        stats.max_time = max(stats.max_time, duration)
+        metrics.DETECTOR_DURATION.labels(detector.name).observe(duration)
+        if duration > detector.budget:
+            stats.overruns += 1
+            metrics.DETECTOR_OVERRUNS.labels(detector.name).inc()
+            stats.backoff = min(stats.backoff * self.BACKOFF_FACTOR, self.MAX_BACKOFF)
+            logging.warning(f"Detector {detector.name} took {duration:.3f}s (budget {detector.budget}s), backing off x{stats.backoff}")
+        elif stats.backoff > 1:
+            stats.backoff = max(stats.backoff // self.BACKOFF_FACTOR, 1)
+
+        if result and self.on_result:
+            self.on_result(detector, *result)
+
+        self._schedule(detector, self.clock() + self.interval(detector))
+
+    async def run(self, stop_event):
+        """Run detectors until `stop_event` is set, then wait for the ones in flight."""
+        self.wakeup = asyncio.Event()
+        stop_waiter = asyncio.ensure_future(stop_event.wait())
+        stop_waiter.add_done_callback(lambda _: self.wakeup.set())
+        self.stats_logged_at = self.clock()
+        try:
+            while not stop_event.is_set():
+                self.wakeup.clear()
+                if self.rate:
+                    self.rate.sample_load()
+                wait = self.start_pending()
+                if self.clock() - self.stats_logged_at >= self.STATS_INTERVAL:
+                    self.log_stats()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            stop_waiter.cancel()
+            if self.tasks:
+                _, pending = await asyncio.wait(self.tasks, timeout=self.SHUTDOWN_TIMEOUT)
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def report(self):
+        return {name: stats.as_dict() for name, stats in self.stats.items()}
+
+    def log_stats(self):
+        self.stats_logged_at = self.clock()
+        for name, stats in self.report().items():
+            logging.info(f"Detector {name}: {stats}")
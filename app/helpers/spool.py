@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from helpers import metrics
+
+
+DATETIME_FIELDS = ("logged_at", "last_logged_at", "created_at")
+
+
+def encode_row(row: dict) -> str:
+    data = dict(row)
+    for field in DATETIME_FIELDS:
+        if isinstance(data.get(field), datetime):
+            data[field] = data[field].isoformat()
+    return json.dumps(data, ensure_ascii=False)
+
+
+def decode_row(line: str) -> dict:
+    data = json.loads(line)
+    for field in DATETIME_FIELDS:
+        if data.get(field):
+            data[field] = datetime.fromisoformat(data[field])
+    return data
+
+
+class Spool:
+    """Append-only on-disk queue of log rows.
+
+    Rows are stored as newline-delimited JSON in numbered segment files. Only
+    the newest segment is written to; older ("sealed") segments are read by
+    `SpoolReplayer` and deleted once they are in the database. Every `write`
+    call is one fsync, so callers control fsync batching by the size of the
+    batches they hand in.
+    """
+    SEGMENT_MAX_BYTES = 1024 * 1024 # 1MB
+    SEGMENT_MAX_AGE = 5 # 5sec
+    SEGMENT_SUFFIX = ".ndjson"
+    LOG_ID_FILE = "log_id"
+
+    def __init__(self, path, segment_max_bytes=None, segment_max_age=None):
+        self.path = path
+        self.segment_max_bytes = segment_max_bytes or self.SEGMENT_MAX_BYTES
+        self.segment_max_age = segment_max_age or self.SEGMENT_MAX_AGE
+        self.lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+
+        # whatever is left from a previous run is sealed, new rows go to a new segment
+        segments = self._segment_numbers()
+        self.active_number = (segments[-1] + 1) if segments else 1
+        self.active_file = None
+        self.active_opened_at = None
+        self.last_log_id = self._read_last_log_id()
+
+    def _segment_path(self, number):
+        return os.path.join(self.path, f"{number:012d}{self.SEGMENT_SUFFIX}")
+
+    def _segment_numbers(self):
+        numbers = []
+        for name in os.listdir(self.path):
+            if name.endswith(self.SEGMENT_SUFFIX):
+                try:
+                    numbers.append(int(name[:-len(self.SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(numbers)
+
+    def _read_last_log_id(self):
+        try:
+            with open(os.path.join(self.path, self.LOG_ID_FILE)) as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_last_log_id(self, log_id):
+        tmp_path = os.path.join(self.path, self.LOG_ID_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(str(log_id))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, os.path.join(self.path, self.LOG_ID_FILE))
+
+    def _seal_active(self):
+        if self.active_file:
+            self.active_file.close()
+            self.active_file = None
+            self.active_number += 1
+
+    def write(self, rows):
+        """Append rows to the active segment and fsync once for the whole batch."""
+        if not rows:
+            return
+        data = "".join(encode_row(row) + "\n" for row in rows).encode("utf-8")
+        with self.lock:
+            if self.active_file is None:
+                self.active_file = open(self._segment_path(self.active_number), "ab")
+                self.active_opened_at = time.monotonic()
+            self.active_file.write(data)
+            self.active_file.flush()
+            os.fsync(self.active_file.fileno())
+
+            max_log_id = max((row.get("log_id") or 0) for row in rows)
+            if max_log_id > self.last_log_id:
+                self.last_log_id = max_log_id
+                self._write_last_log_id(max_log_id)
+
+            if self.active_file.tell() >= self.segment_max_bytes:
+                self._seal_active()
+
+    def sealed_segments(self):
+        """Return paths of segments ready for replay, oldest first.
+
+        The active segment is sealed here once it is older than
+        `segment_max_age`, so rows never wait on disk longer than that.
+        """
+        with self.lock:
+            if self.active_file and time.monotonic() - self.active_opened_at >= self.segment_max_age:
+                self._seal_active()
+            return [self._segment_path(n) for n in self._segment_numbers() if n < self.active_number]
+
+    @staticmethod
+    def read_segment(segment_path, chunk_size):
+        """Yield lists of at most `chunk_size` rows from a segment."""
+        chunk = []
+        with open(segment_path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    chunk.append(decode_row(line))
+                except ValueError:
+                    # torn write from a crash, the rest of the segment is still usable
+                    logging.warning(f"Skipping corrupt spool record {segment_path}:{line_number}")
+                    continue
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def remove_segment(segment_path):
+        os.remove(segment_path)
+
+    def close(self):
+        with self.lock:
+            self._seal_active()
+
+
+class SpoolReplayer:
+    """Drains sealed spool segments through a transport.
+
+    Chunks are handed to `transport.send` (see helpers/transport.py), which
+    stores them idempotently, so replaying a segment twice after a crash or a
+    failed send is harmless. While the destination is unreachable the
+    replayer backs off exponentially and leaves the rows on disk; afterwards
+    it catches up at no more than `max_rows_per_second`.
+    """
+    CHUNK_SIZE = 500
+    POLL_INTERVAL = 1 # 1sec
+    MAX_ROWS_PER_SECOND = 2000
+    RETRY_MIN = 1 # 1sec
+    RETRY_MAX = 60 # 1min
+
+    def __init__(self, spool, transport, chunk_size=None, max_rows_per_second=None):
+        self.spool = spool
+        self.transport = transport
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.max_rows_per_second = max_rows_per_second or self.MAX_ROWS_PER_SECOND
+        self.retry_delay = self.RETRY_MIN
+        self.thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, name="spool-replayer", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=10):
+        self._stop.set()
+        if self.thread:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.replay()
+                self.retry_delay = self.RETRY_MIN
+                self._stop.wait(self.POLL_INTERVAL)
+            except Exception as e:
+                metrics.TRANSPORT_FAILURES.inc()
+                logging.error(f"Spool replay failed, retrying in {self.retry_delay}s: {e}")
+                self._stop.wait(self.retry_delay)
+                self.retry_delay = min(self.retry_delay * 2, self.RETRY_MAX)
+
+    def replay(self):
+        """Replay every sealed segment; raises on the first failed chunk."""
+        for segment_path in self.spool.sealed_segments():
+            for rows in self.spool.read_segment(segment_path, self.chunk_size):
+                if self._stop.is_set():
+                    return
+                started_at = time.monotonic()
+                with metrics.TRANSPORT_SEND_DURATION.time():
+                    self.transport.send(rows)
+                # keep catch-up load on the database flat after a long outage
+                min_duration = len(rows) / self.max_rows_per_second
+                self._stop.wait(max(0, min_duration - (time.monotonic() - started_at)))
+            self.spool.remove_segment(segment_path)
+            logging.debug(f"Spool segment replayed: {segment_path}")
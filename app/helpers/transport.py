@@ -0,0 +1,112 @@
+import gzip
+import json
+import logging
+import http.client
+from urllib.parse import urlsplit
+from helpers.spool import encode_row
+from helpers import codec
+
+
+class TransportError(Exception):
+    """The batch was not stored; it stays in the spool and is retried."""
+
+
+class DatabaseTransport:
+    """Writes log batches straight to the database with one upsert per batch.
+
+    Rows are keyed on (user_id, meeting_id, log_id, logged_at), so sending a
+    batch twice after a crash or a failed commit is harmless.
+    """
+    CONFLICT_COLUMNS = ("user_id", "meeting_id", "log_id", "logged_at")
+    # rows spooled by older versions lack these, and a multi-row insert needs the same keys in every row
+    ROW_DEFAULTS = {"detector": None, "repeat_count": 1, "last_logged_at": None}
+
+    def __init__(self, session_factory, model):
+        self.session_factory = session_factory
+        self.model = model
+
+    def send(self, rows):
+        rows = [{**self.ROW_DEFAULTS, **row} for row in rows]
+        db = self.session_factory()
+        from sqlalchemy.dialects import postgresql, sqlite
+        try:
+            dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(self.model).on_conflict_do_nothing(index_elements=list(self.CONFLICT_COLUMNS))
+            db.execute(stmt, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def close(self):
+        pass
+
+
+class HttpTransport:
+    """Ships log batches to the web service's ingestion endpoint.
+
+    Each batch is one gzip-compressed POST over a kept-alive connection, so
+    a desktop client holds no database connection at all. Batches are
+    NDJSON, or the compact event format of helpers/codec.py with
+    `binary=True`, which only servers that know that format accept.
+    The server upserts on the same key as `DatabaseTransport`, which makes
+    resending a batch harmless. A batch the server rejects as invalid is
+    logged and dropped, since sending it again would fail the same way and
+    block everything spooled after it; anything else raises TransportError
+    and the batch stays in the spool.
+    """
+    TIMEOUT = 30 # 30sec
+    COMPRESS_LEVEL = 6
+    REJECTED_STATUSES = (400, 413, 422)
+
+    def __init__(self, url, token=None, timeout=None, binary=False):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or "/"
+        self.token = token
+        self.timeout = timeout or self.TIMEOUT
+        self.binary = binary
+        self.connection = None
+
+    def _connect(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def encode(self, rows):
+        if self.binary:
+            return codec.encode_rows(rows), codec.MEDIA_TYPE
+        return "".join(encode_row(row) + "\n" for row in rows).encode("utf-8"), "application/x-ndjson"
+
+    def send(self, rows):
+        body, content_type = self.encode(rows)
+        body = gzip.compress(body, self.COMPRESS_LEVEL)
+        headers = {"Content-Type": content_type, "Content-Encoding": "gzip"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        try:
+            if self.connection is None:
+                self.connection = self._connect()
+            self.connection.request("POST", self.path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()
+            raise TransportError(f"Could not send {len(rows)} rows: {e}") from e
+
+        if response.status in self.REJECTED_STATUSES:
+            logging.error(f"Ingestion rejected {len(rows)} rows ({response.status}): {payload[:500]!r}")
+            return
+        if response.status != 200:
+            raise TransportError(f"Ingestion failed ({response.status}): {payload[:500]!r}")
+        result = json.loads(payload)
+        logging.debug(f"Ingested {result.get('inserted')} of {len(rows)} rows")
+
+    def close(self):
+        if self.connection:
+            self.connection.close()
+            self.connection = None
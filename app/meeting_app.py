@@ -1,20 +1,14 @@
-import sys
 import os
+import sys
 import time
-from datetime import datetime
-import shutil
-import subprocess
+import queue
 import logging
-import tempfile
-import psutil
-import threading
 import tkinter as tk
-from playwright.sync_api import sync_playwright
-from models.db import SessionLocal, UserLogs
 
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    # DEBUG logs every flush and replayed segment, which costs more than it tells; metrics cover that now
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format="%(asctime)s [%(levelname)s] %(message)s",
     handlers=[
         logging.FileHandler("app.log", mode="w", delay=False),
@@ -25,19 +19,15 @@ logging.basicConfig(
 
 
 class App:
-    ACTIVITY_STATUS_SAFE = "safe"
-    ACTIVITY_STATUS_WARNING = "warning"
-    ACTIVITY_STATUS_DANGER = "danger"
-    ZOOM_URL = "https://app.zoom.us/wc/6810523567/join?fromPWA=1&pwd=hfuKvvkIOuTNlESTRNWZJ8jI6YSaie.1"
-    CHROME_CDP_PORT=9222 # http://localhost:9222 must be not in use on User's machine
-    CHECK_INTERVAL = 1 # 1sec
-
-    running = False
-    log_id = 0
+    UI_POLL_INTERVAL = 100 # 100ms
+    MEETING_ID = "test-meeting"
 
     def __init__(self, root):
         self.root = root
-        self.db = SessionLocal()
+        # the monitor runs on its own thread and reports back through this queue only
+        self.ui_queue = queue.Queue()
+        self.monitor = None
+        self.closing = False
 
         root.title("Meeting App")
         root.geometry("300x150")
@@ -51,201 +41,79 @@ class App:
         self.stop_btn = tk.Button(root, text="Stop Monitoring", command=self.stop_monitor, state=tk.DISABLED)
         self.stop_btn.pack(pady=5)
 
-        self.running = False
-        self.thread = None
-        self.browser = None
-        self.context = None
-        self.page = None
-        self.chrome_process = None
-        
+        self.root.after(self.UI_POLL_INTERVAL, self.poll_ui_queue)
+
     def start_monitor(self):
-        pass
-        self.running = True
         self.start_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         self.status_label.config(text="Status: Starting Chrome...")
         logging.info("Starting Chrome for Zoom monitoring")
 
-        self.thread = threading.Thread(target=self.run)
-        self.thread.start()
+        # playwright, psutil and SQLAlchemy come in with the session manager; importing
+        # them here instead of at the top keeps them off the path to the first window
+        from session_manager import SessionManager
+        self.monitor = SessionManager(self.ui_queue)
+        self.monitor.add_session(self.MEETING_ID)
+        self.monitor.start()
 
     def stop_monitor(self):
-        pass
-        self.running = False
-        self.start_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
-        self.status_label.config(text="Status: Stopped")
-        logging.info("Stopped monitoring")
-
-        if self.browser:
-            self.browser.close()
-        if self.chrome_process:
-            self.chrome_process.terminate()
-
-    def run(self):
-        self.log_id = 0 # reset log_id
-        try:
-            # launch browser
-            user_data_dir = os.path.join(tempfile.gettempdir(), "chrome_profile")
-            os.makedirs(user_data_dir, exist_ok=True)
-            chrome_path = self.find_chrome_executable()
-            process = subprocess.Popen([
-                chrome_path,
-                "--remote-debugging-address=127.0.0.1",
-                f"--remote-debugging-port={self.CHROME_CDP_PORT}",
-                f"--user-data-dir={user_data_dir}"  # self.get_user_data_dir()
-            ])
-            time.sleep(20)
-            if process:
-                logging.info("Chrome launched")
-            else:
-                raise Exception("Chrome launching failed")
-
-            self.status_label.config(text="Status: Connecting to Chrome...")
-
-            with sync_playwright() as p:
-                # connect over cdp
-                self.browser = p.chromium.connect_over_cdp(f"http://127.0.0.1:{self.CHROME_CDP_PORT}")
-                self.context = self.browser.contexts[0] if self.browser.contexts else self.browser.new_context()
-                self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
-                self.page.goto(self.ZOOM_URL)
-                logging.info(f"Navigated to Zoom URL: {self.ZOOM_URL}")
-
-                self.status_label.config(text="Status: Monitoring Zoom page")
-                time.sleep(10)
-
-                while self.running:
-                    try:
-                        pages = self.context.pages
-                        log_msg = ""
-                        if not pages:
-                            log_msg = "❌ No open browser pages"
-                            self.status_label.config(text=log_msg)
-                            logging.info(log_msg)
-
-                        page = pages[0]
-                        current_url = page.url
-                        page.locator("title").inner_text() # hack for refreshing page.url
-
-                        if not log_msg:
-                            if current_url.startswith("https://app.zoom.us/wc/6810523567"):
-                                self.status_label.config(text="✅ Zoom page open")
-                            else:
-                                log_msg = "⚠️ URL changed"
-                                self.status_label.config(text=log_msg)
-
-                        if log_msg:
-                            self.log_id += 1 # incremet log_id
-                            self.status_label.config(text=log_msg)
-                            log_datetime = datetime.now()
-                            logging.info(log_msg)
-
-                            user_log = UserLogs()
-                            user_log.user_id = "test-user"
-                            user_log.user_fingerprint = "test-fingerprint"
-                            user_log.meeting_id = "test-meeting"
-                            user_log.log_id = self.log_id
-                            user_log.log = log_msg
-                            user_log.activity_status = self.ACTIVITY_STATUS_WARNING
-                            user_log.logged_at = log_datetime
-                            user_log.created_at = log_datetime
-                            self.db.add(user_log)
-                            self.db.commit()
-
-                        self.check_for_cheating_software()
-                        time.sleep(self.CHECK_INTERVAL)
-                    except Exception as e:
-                        logging.error(f"Page monitoring error: {e}")
-                        pass
-
-        except Exception as e:
-            self.status_label.config(text=f"Error: {e}")
-            logging.error(f"Error: {e}")
-        finally:
-            if self.browser:
-                self.browser.close()
-            if self.chrome_process:
-                self.chrome_process.terminate()
-            logging.error("Chrome and Playwright closed")
-    
-    
-    @staticmethod
-    def check_for_software(software):
-        for proc in psutil.process_iter(attrs=["name"]):
-            if software in proc.info["name"].lower():
-                return True
-        
-        return False
-
-    def check_for_cheating_software(self):
-        self.log_id += 1 # incremet log_id
-        
-        cheating_detected = self.check_for_software("cluely")
-        log_datetime = datetime.now()
-        if cheating_detected:
-            activity_status = self.ACTIVITY_STATUS_DANGER
-            msg = "❌ Cluely is running"
+        self.status_label.config(text="Status: Stopping...")
+        logging.info("Stopping monitoring")
+
+        if self.monitor:
+            self.monitor.stop()
+
+    def close(self):
+        """Stop monitoring and close the window once the monitor has shut down."""
+        self.closing = True
+        if self.monitor:
+            self.stop_monitor()
         else:
-            activity_status = self.ACTIVITY_STATUS_SAFE
-            msg = "✅ Cheating software in not running"
-
-        # output log for debug
-        logging.info(msg)
-
-        # show log in the software
-        # self.status_label.config(text=msg)
-
-        # save log
-        user_log = UserLogs()
-        user_log.user_id = "test-user"
-        user_log.user_fingerprint = "test-fingerprint"
-        user_log.meeting_id = "test-meeting"
-        user_log.log_id = self.log_id
-        user_log.log = msg
-        user_log.activity_status = activity_status
-        user_log.logged_at = log_datetime
-        user_log.created_at = log_datetime
-        self.db.add(user_log)
-        self.db.commit()
-        
-    @staticmethod
-    def get_user_data_dir():
-        if sys.platform.startswith("win"):
-            return os.path.join(os.environ["LOCALAPPDATA"], "Google", "Chrome", "User Data")
-        elif sys.platform == "darwin":
-            return os.path.expanduser("~/Library/Application Support/Google/Chrome")
-        else:  # Linux / Unix
-            return os.path.expanduser("~/.config/google-chrome")
-        
-    @staticmethod
-    def find_chrome_executable():
-        candidates = []
-        if sys.platform == "darwin":  # macOS
-            candidates = [
-                "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
-            ]
-        elif sys.platform.startswith("win"):  # Windows
-            candidates = [
-                os.path.expandvars(r"%ProgramFiles%\Google\Chrome\Application\chrome.exe"),
-                os.path.expandvars(r"%ProgramFiles(x86)%\Google\Chrome\Application\chrome.exe"),
-                os.path.expandvars(r"%LocalAppData%\Google\Chrome\Application\chrome.exe"),
-            ]
-
-        for c in candidates:
-            path = shutil.which(c) if not os.path.isabs(c) else (c if os.path.exists(c) else None)
-            if path:
-                return path
-
-        raise Exception("Chrome executable not found")
-    
+            self.root.destroy()
+
+    def report_startup(self, path):
+        """Write the time the window first appeared to `path` and quit, see benchmarks/time_to_window.py."""
+        def on_map(event):
+            if event.widget is not self.root:
+                return
+            with open(path, "w") as f:
+                f.write(repr(time.time()))
+            self.root.destroy()
+
+        self.root.bind("<Map>", on_map)
+
+    def poll_ui_queue(self):
+        while True:
+            try:
+                kind, value = self.ui_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "status":
+                self.status_label.config(text=value)
+            elif kind == "stopped":
+                self.monitor = None
+                self.start_btn.config(state=tk.NORMAL)
+                self.stop_btn.config(state=tk.DISABLED)
+                self.status_label.config(text="Status: Stopped")
+                logging.info("Stopped monitoring")
+                if self.closing:
+                    self.root.destroy()
+                    return
+
+        self.root.after(self.UI_POLL_INTERVAL, self.poll_ui_queue)
+
 
 if __name__ == "__main__":
     try:
         root = tk.Tk()
         app = App(root)
-        root.protocol("WM_DELETE_WINDOW", app.stop_monitor)
+        root.protocol("WM_DELETE_WINDOW", app.close)
+        if os.getenv("MEETING_APP_STARTUP_FILE"):
+            app.report_startup(os.environ["MEETING_APP_STARTUP_FILE"])
         root.mainloop()
     except KeyboardInterrupt:
         logging.info("Shutting down ...")
     except Exception as e:
-        logging.error(e)
\ No newline at end of file
+        logging.error(e)
@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=['models.db'],
+    hiddenimports=['models.db', 'helpers.log_sink', 'helpers.spool', 'helpers.process_watcher', 'helpers.scheduler', 'helpers.browser_watcher', 'helpers.chrome', 'helpers.run_length_log', 'helpers.transport', 'helpers.codec', 'helpers.fingerprint', 'helpers.metrics', 'helpers.profiler', 'detectors', 'monitor', 'session_manager'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
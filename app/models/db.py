@@ -1,7 +1,7 @@
 import os
 from datetime import datetime as dt
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, JSON
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Float, JSON, UniqueConstraint, Index
 from pydantic import BaseModel, constr, HttpUrl
 from sqlalchemy.orm import sessionmaker, declarative_base
 
@@ -15,26 +15,51 @@ os.environ["DB_NAME"] = "sandbox"
 
 
 DATABASE_URL = f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+# Bound on first use, so importing the models never opens a connection or loads the driver
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
+_engine = None
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = create_engine(DATABASE_URL)
+        SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def get_session():
+    get_engine()
+    return SessionLocal()
 
 
 # Models
+# The schema is owned by the web service, see web/migrations.
 
 class UserLogs(Base):
     __tablename__ = "user_logs"
+    __table_args__ = (
+        # spool replay upserts on this key, see helpers/spool.py; logged_at is
+        # part of it because the server partitions user_logs on that column
+        UniqueConstraint("user_id", "meeting_id", "log_id", "logged_at", name="uq_user_logs_user_meeting_log"),
+        Index("ix_user_logs_meeting_logged_at", "meeting_id", "logged_at"),
+        Index("ix_user_logs_user_logged_at", "user_id", "logged_at"),
+        Index("ix_user_logs_fingerprint_logged_at", "user_fingerprint", "logged_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(String)
     user_fingerprint = Column(String)
     meeting_id = Column(String)
     log_id = Column(Integer)
+    detector = Column(String)
     log = Column(String)
     activity_status = Column(String)
+    # a row stands for `repeat_count` identical results from logged_at to last_logged_at
+    repeat_count = Column(Integer, nullable=False, default=1)
     logged_at = Column(DateTime)
-    created_at = Column(DateTime, default=dt.now())
+    last_logged_at = Column(DateTime)
+    created_at = Column(DateTime, default=dt.now)
 
 
-if not os.getenv("TESTING"):
-    Base.metadata.create_all(bind=engine)
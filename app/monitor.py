@@ -0,0 +1,202 @@
+import sys
+import os
+import re
+import asyncio
+import logging
+import tempfile
+import subprocess
+from datetime import datetime
+from playwright.async_api import async_playwright
+from helpers.scheduler import Scheduler, AdaptiveRate
+from helpers.browser_watcher import BrowserWatcher
+from helpers.run_length_log import RunLengthLog
+from helpers.chrome import DEVTOOLS_PORT_FILE, StartupTimer, find_chrome_executable, launch_chrome, wait_for_devtools_port, wait_for_cdp
+from detectors import CheatingSoftwareDetector
+
+
+class Monitor:
+    """Monitors one meeting session in a Chrome of its own.
+
+    Runs as a task on the `SessionManager` event loop and uses the manager's
+    shared log sink, process watcher and log_id sequence. Chrome is started
+    with `--remote-debugging-port=0` and a per-meeting profile directory, so
+    any number of sessions can run side by side on one machine.
+    """
+    ACTIVITY_STATUS_SAFE = "safe"
+    ACTIVITY_STATUS_WARNING = "warning"
+    ACTIVITY_STATUS_DANGER = "danger"
+    ZOOM_URL = "https://app.zoom.us/wc/6810523567/join?fromPWA=1&pwd=hfuKvvkIOuTNlESTRNWZJ8jI6YSaie.1"
+    MEETING_URL_PREFIX = "https://app.zoom.us/wc/6810523567"
+    CHROME_STARTUP_TIMEOUT = 60 # 1min
+    # process name substring -> name shown in logs
+    CHEATING_SOFTWARE = {
+        "cluely": "Cluely",
+    }
+
+    def __init__(self, manager, meeting_id, meeting_url=None, url_prefix=None):
+        self.manager = manager
+        self.meeting_id = meeting_id
+        self.meeting_url = meeting_url or self.ZOOM_URL
+        self.url_prefix = url_prefix or self.MEETING_URL_PREFIX
+        safe_meeting_id = re.sub(r"[^A-Za-z0-9_.-]", "_", meeting_id)
+        self.user_data_dir = os.path.join(tempfile.gettempdir(), f"chrome_profile_{safe_meeting_id}")
+
+        self.cdp_port = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.chrome_process = None
+        self.scheduler = None
+        self.browser_watcher = None
+        self.last_status = {} # detector name -> last activity status
+        self.startup_timer = None
+        self.run_length_log = RunLengthLog(self.save_log)
+
+    @property
+    def stop_event(self):
+        return self.manager.stop_event
+
+    @property
+    def process_watcher(self):
+        return self.manager.process_watcher
+
+    def post_status(self, text):
+        self.manager.post_status(self, text)
+
+    async def run(self):
+        try:
+            await self.monitor()
+        except Exception as e:
+            self.post_status(f"Error: {e}")
+            logging.error(f"[{self.meeting_id}] Error: {e}")
+        finally:
+            await self.shutdown()
+
+    def chrome_command(self):
+        return [
+            find_chrome_executable(),
+            "--remote-debugging-address=127.0.0.1",
+            "--remote-debugging-port=0", # Chrome picks a free port and writes it to DevToolsActivePort
+            f"--user-data-dir={self.user_data_dir}"  # self.get_user_data_dir()
+        ]
+
+    async def start_chrome(self):
+        """Launch Chrome and wait until its CDP endpoint answers; returns False if stopped first."""
+        os.makedirs(self.user_data_dir, exist_ok=True)
+        # a port file left by an earlier Chrome would point at a dead port
+        try:
+            os.remove(os.path.join(self.user_data_dir, DEVTOOLS_PORT_FILE))
+        except FileNotFoundError:
+            pass
+
+        self.chrome_process = launch_chrome(self.chrome_command())
+        self.startup_timer.mark("chrome_launched")
+
+        wait_kwargs = {"timeout": self.CHROME_STARTUP_TIMEOUT, "process": self.chrome_process, "stop_event": self.stop_event}
+        self.cdp_port = await wait_for_devtools_port(self.user_data_dir, **wait_kwargs)
+        if self.cdp_port is None:
+            return False
+        version = await wait_for_cdp(self.cdp_port, **wait_kwargs)
+        if version is None:
+            return False
+        self.startup_timer.mark("cdp_ready")
+        logging.info(f"[{self.meeting_id}] Chrome CDP ready on port {self.cdp_port}: {version.get('Browser')}")
+        return True
+
+    async def monitor(self):
+        self.startup_timer = StartupTimer()
+        if not await self.start_chrome():
+            return
+
+        self.post_status("Status: Connecting to Chrome...")
+
+        async with async_playwright() as p:
+            try:
+                # connect over cdp
+                self.browser = await p.chromium.connect_over_cdp(f"http://127.0.0.1:{self.cdp_port}")
+                self.startup_timer.mark("cdp_connected")
+                self.context = self.browser.contexts[0] if self.browser.contexts else await self.browser.new_context()
+                self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+                await self.page.goto(self.meeting_url, wait_until="domcontentloaded")
+                self.startup_timer.mark("page_loaded")
+                logging.info(f"[{self.meeting_id}] Navigated to Zoom URL: {self.meeting_url}")
+
+                self.post_status("Status: Monitoring Zoom page")
+
+                # collection started with the session and ran while Chrome and the page loaded,
+                # so this rarely waits; rows must not go out without the fingerprint
+                await self.manager.device_fingerprint()
+
+                # URL and tab changes arrive as events on this loop, nothing polls the page
+                self.browser_watcher = BrowserWatcher(
+                    self.browser, self.page, self.url_prefix, self.record_detection,
+                    self.ACTIVITY_STATUS_SAFE, self.ACTIVITY_STATUS_WARNING,
+                )
+                await self.browser_watcher.start()
+
+                self.scheduler = Scheduler(on_result=self.record_detection, rate=AdaptiveRate())
+                self.scheduler.register(CheatingSoftwareDetector(self))
+                await self.scheduler.run(self.stop_event)
+                self.scheduler.log_stats()
+            finally:
+                if self.browser_watcher:
+                    await self.browser_watcher.stop()
+                if self.browser:
+                    await self.browser.close()
+
+    async def shutdown(self):
+        # the sink is stopped by the manager after every session has shut down
+        self.run_length_log.flush()
+        if self.chrome_process:
+            self.chrome_process.terminate()
+            try:
+                await asyncio.to_thread(self.chrome_process.wait, 10)
+            except subprocess.TimeoutExpired:
+                self.chrome_process.kill()
+        logging.info(f"[{self.meeting_id}] Chrome and Playwright closed")
+
+    def record_detection(self, detector, activity_status, msg):
+        if self.startup_timer:
+            self.startup_timer.mark("first_check")
+        # browser events count too: a tab switch makes the detectors look again sooner
+        if self.scheduler:
+            self.scheduler.observe(activity_status != self.ACTIVITY_STATUS_SAFE)
+
+        # only changes are logged and saved right away, repeats are counted
+        if self.run_length_log.record(detector.name, activity_status, msg):
+            # output log for debug
+            logging.info(f"[{self.meeting_id}] {msg}")
+
+        # show log in the software: problems, and the first safe result after one
+        last_status = self.last_status.get(detector.name, self.ACTIVITY_STATUS_SAFE)
+        if activity_status != self.ACTIVITY_STATUS_SAFE or last_status != self.ACTIVITY_STATUS_SAFE:
+            self.post_status(msg)
+        self.last_status[detector.name] = activity_status
+
+    def save_log(self, detector_name, activity_status, msg, first_at, last_at, count):
+        """Hand a log row to the shared background sink, which spools it to disk; never blocks on the database.
+
+        A row stands for `count` identical results between `first_at` and `last_at`.
+        """
+        self.manager.log_sink.put({
+            "user_id": "test-user",
+            "user_fingerprint": self.manager.fingerprint,
+            "meeting_id": self.meeting_id,
+            "log_id": self.manager.next_log_id(),
+            "detector": detector_name,
+            "log": msg,
+            "activity_status": activity_status,
+            "repeat_count": count,
+            "logged_at": first_at,
+            "last_logged_at": last_at,
+            "created_at": datetime.now(),
+        })
+
+    @staticmethod
+    def get_user_data_dir():
+        if sys.platform.startswith("win"):
+            return os.path.join(os.environ["LOCALAPPDATA"], "Google", "Chrome", "User Data")
+        elif sys.platform == "darwin":
+            return os.path.expanduser("~/Library/Application Support/Google/Chrome")
+        else:  # Linux / Unix
+            return os.path.expanduser("~/.config/google-chrome")
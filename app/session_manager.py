@@ -0,0 +1,152 @@
+import os
+import sys
+import queue
+import asyncio
+import logging
+import argparse
+import threading
+from helpers.log_sink import LogSink
+from helpers.spool import Spool, SpoolReplayer
+from helpers.transport import DatabaseTransport, HttpTransport
+from helpers.process_watcher import ProcessWatcher
+from helpers.metrics import StatsWriter
+from helpers.profiler import SamplingProfiler
+from helpers.fingerprint import DeviceFingerprint
+from monitor import Monitor
+
+
+class SessionManager:
+    """Runs any number of monitored meeting sessions from one process.
+
+    Owns the monitoring thread and its event loop, plus everything sessions
+    share: one spool-backed log sink and replayer, one process watcher and the
+    log_id sequence. The UI is only talked to through `ui_queue`, with
+    ("status", text) while running and ("stopped", None) once every session
+    has shut down.
+    """
+    SPOOL_DIR = os.path.join(os.path.expanduser("~"), ".meeting_app", "spool")
+    # when set, logs go to the web service's ingestion endpoint instead of straight to Postgres
+    INGEST_URL = os.getenv("INGEST_URL")
+    INGEST_TOKEN = os.getenv("INGEST_TOKEN")
+    # "binary" sends the compact event format of helpers/codec.py instead of NDJSON
+    INGEST_FORMAT = os.getenv("INGEST_FORMAT", "ndjson")
+    # Prometheus text format, rewritten every few seconds while monitoring
+    STATS_FILE = os.getenv("MEETING_APP_STATS_FILE", os.path.join(os.path.expanduser("~"), ".meeting_app", "metrics.prom"))
+    # when set, a sampling profiler runs while monitoring and writes collapsed stacks here
+    PROFILE_FILE = os.getenv("MEETING_APP_PROFILE")
+
+    def __init__(self, ui_queue):
+        self.ui_queue = ui_queue
+        self.spool = Spool(self.SPOOL_DIR)
+        self.log_sink = LogSink(self.spool)
+        self.transport = self.make_transport()
+        self.spool_replayer = SpoolReplayer(self.spool, self.transport)
+        self.stats_writer = StatsWriter(self.STATS_FILE)
+        self.profiler = SamplingProfiler(self.PROFILE_FILE) if self.PROFILE_FILE else None
+        self.sessions = []
+
+        self.thread = None
+        self.loop = None
+        self.stop_event = None
+        self.stopping = False
+        self.process_watcher = None
+        self.log_id = 0
+        self.fingerprint = None
+        self.fingerprint_task = None
+
+    def make_transport(self):
+        if self.INGEST_URL:
+            return HttpTransport(self.INGEST_URL, self.INGEST_TOKEN, binary=self.INGEST_FORMAT == "binary")
+        # SQLAlchemy and the Postgres driver are only loaded when logs go straight to the database
+        from models.db import get_session, UserLogs
+        return DatabaseTransport(get_session, UserLogs)
+
+    def add_session(self, meeting_id, meeting_url=None, url_prefix=None):
+        if any(session.meeting_id == meeting_id for session in self.sessions):
+            raise ValueError(f"Meeting is already monitored: {meeting_id}")
+        session = Monitor(self, meeting_id, meeting_url, url_prefix)
+        self.sessions.append(session)
+        return session
+
+    def start(self):
+        self.thread = threading.Thread(target=asyncio.run, args=(self.run(),), name="monitor", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Ask every session to shut down; safe to call from any thread."""
+        self.stopping = True
+        if self.loop and self.stop_event:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+
+    def post_status(self, session, text):
+        if len(self.sessions) > 1:
+            text = f"[{session.meeting_id}] {text}"
+        self.ui_queue.put(("status", text))
+
+    async def device_fingerprint(self):
+        """Wait for the fingerprint collected at start; every session shares it."""
+        self.fingerprint = await self.fingerprint_task
+        return self.fingerprint
+
+    def next_log_id(self):
+        # only called on the event loop thread, so no lock is needed
+        self.log_id += 1 # incremet log_id
+        return self.log_id
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        if self.stopping:
+            self.stop_event.set()
+
+        self.log_id = self.spool.last_log_id # continue after the last spooled log_id so replay upserts never collide
+        # collected while Chrome starts; sessions wait for it before their first check
+        self.fingerprint_task = asyncio.ensure_future(asyncio.to_thread(DeviceFingerprint().get))
+        self.log_sink.start()
+        self.spool_replayer.start()
+        self.stats_writer.start()
+        if self.profiler:
+            self.profiler.start()
+        self.process_watcher = ProcessWatcher(Monitor.CHEATING_SOFTWARE)
+        try:
+            await asyncio.gather(*(session.run() for session in self.sessions))
+        finally:
+            # both join their worker threads after writing out what they hold
+            await asyncio.to_thread(self.log_sink.stop)
+            await asyncio.to_thread(self.spool_replayer.stop)
+            self.transport.close()
+            self.spool.close()
+            self.process_watcher.close()
+            await asyncio.to_thread(self.stats_writer.stop)
+            if self.profiler:
+                await asyncio.to_thread(self.profiler.stop)
+            self.ui_queue.put(("stopped", None))
+
+
+def main():
+    """Headless entry point for proctoring stations and load-test rigs."""
+    parser = argparse.ArgumentParser(description="Monitor several meetings from one process.")
+    parser.add_argument("meeting_ids", nargs="+", help="one monitored session per meeting id")
+    parser.add_argument("--url", default=Monitor.ZOOM_URL, help="meeting URL opened in every session")
+    parser.add_argument("--url-prefix", default=Monitor.MEETING_URL_PREFIX)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s", stream=sys.stdout)
+
+    ui_queue = queue.Queue()
+    manager = SessionManager(ui_queue)
+    for meeting_id in args.meeting_ids:
+        manager.add_session(meeting_id, args.url, args.url_prefix)
+    manager.start()
+    try:
+        while ui_queue.get()[0] != "stopped":
+            pass
+    except KeyboardInterrupt:
+        logging.info("Shutting down ...")
+        manager.stop()
+        while ui_queue.get()[0] != "stopped":
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Requests/sec of the web app's hot routes under concurrency.
+
+Runs against a server that is already listening, so the same script
+measures any version of the app:
+
+    cd web && uvicorn main:app --port 8000 &
+    cd web && python -m benchmarks.http_routes --base-url http://127.0.0.1:8000 \
+        --concurrency 50 --duration 15
+
+or, with --serve, starts `uvicorn main:app` itself on a free port (with
+--server-workers workers and a generated INGEST_TOKEN) and stops it at
+the end. Either way the database is the one DB_* points to; fill it with
+benchmarks.seed first to measure at production volumes.
+
+Seeds one benchmark account through /api/signup (reused when it exists),
+--meetings meetings for it and --report-logs log rows in its newest
+meeting straight in the database; listing latency should not change
+between --meetings 20 and --meetings 50000. Then, per route, --concurrency
+workers send requests back to back for --duration seconds:
+
+  meetings      GET /meetings with a signed-in session
+  meetings_api  GET /api/meetings, following next_cursor to the last page
+                and starting over, so deep pages are measured too
+  report        GET /meeting-report/{id} of the meeting with the logs
+  ingest        POST /api/ingest/user-logs, gzip-compressed NDJSON batches
+                of --ingest-batch new rows (needs --ingest-token, or
+                --serve); the rows are deleted again afterwards
+  signin        POST /api/signin with the benchmark credentials
+
+Prints a JSON report with requests/sec, latency percentiles and errors.
+With --baseline FILE the report is compared with an earlier one: a route
+whose requests/sec dropped, or whose p50 or p99 latency grew, by more than
+--max-regression fails the run with exit status 1. A missing baseline file
+is written instead, as is any with --update-baseline. Baselines only
+compare on the same machine, database and settings.
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import uuid
+import socket
+import asyncio
+import argparse
+import itertools
+import secrets
+import subprocess
+from datetime import datetime
+import httpx
+from sqlalchemy import select, func, text
+from models.db import engine, Client, Meeting
+from benchmarks.seed import seed_account_meetings, seed_meeting_logs
+
+
+EMAIL = "benchmark@example.com"
+PASSWORD = "benchmark-password"
+CSRF_TOKEN = secrets.token_urlsafe(32)
+# double-submit CSRF only compares cookie and header, so one fixed token serves every request
+CSRF_HEADERS = {"X-CSRF-Token": CSRF_TOKEN, "Cookie": f"csrf_token={CSRF_TOKEN}"}
+INGEST_USER_ID = "bench-ingest"
+ROUTES = ("meetings", "meetings_api", "report", "ingest", "signin")
+# a baseline recorded with other values measures something else
+SETTINGS = ("concurrency", "meetings", "report_logs", "ingest_batch", "server_workers")
+WEB_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(int(round(q / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+async def sign_in(client):
+    credentials = {"email": EMAIL, "password": PASSWORD}
+    response = await client.post("/api/signin", json=credentials, headers=CSRF_HEADERS)
+    if not response.json().get("ok"):
+        signup = {"first_name": "Bench", "last_name": "Mark", **credentials}
+        response = await client.post("/api/signup", json=signup, headers=CSRF_HEADERS)
+        if not response.json().get("ok"):
+            sys.exit(f"Could not create the benchmark account: {response.text}")
+    return response.cookies["session"]
+
+
+def dataset_size():
+    with engine.connect() as conn:
+        return {
+            "clients": conn.scalar(select(func.count()).select_from(Client)),
+            "meetings": conn.scalar(select(func.count()).select_from(Meeting)),
+            # planner estimate, an exact count of a 100M-row table takes minutes
+            "user_logs": int(conn.scalar(text("""
+                SELECT coalesce(sum(greatest(c.reltuples, 0)), 0)
+                FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'user_logs'::regclass
+            """))),
+        }
+
+
+def delete_ingested():
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM user_logs WHERE user_id = :user_id"), {"user_id": INGEST_USER_ID})
+
+
+# ---- Server ---------------------------------------------------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, ingest_token, timeout=60):
+    port = free_port()
+    env = {**os.environ, "INGEST_TOKEN": ingest_token}
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    process = subprocess.Popen(command, cwd=WEB_DIR, env=env)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"Server exited with status {process.returncode}: {' '.join(command)}")
+        try:
+            httpx.get(f"{base_url}/signin", timeout=1)
+            return process, base_url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    stop_server(process)
+    sys.exit(f"Server did not answer within {timeout}s: {' '.join(command)}")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+# ---- Load -----------------------------------------------------------
+async def run_route(client, send, concurrency, duration):
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.monotonic() < deadline:
+            started_at = time.perf_counter()
+            try:
+                response = await send()
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - started_at)
+            errors += not ok
+
+    started_at = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started_at
+
+    def ms(value):
+        return round(value * 1000, 3) if value is not None else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(max(latencies) if latencies else None),
+        },
+    }
+
+
+async def run(args, base_url):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        session_cookie = await sign_in(client)
+        await asyncio.to_thread(seed_account_meetings, EMAIL, args.meetings)
+        report_meeting_id = await asyncio.to_thread(seed_meeting_logs, EMAIL, args.report_logs)
+        dataset = await asyncio.to_thread(dataset_size)
+        client.cookies.clear()
+
+        session_headers = {"Cookie": f"session={session_cookie}"}
+        cursor = None
+
+        async def meetings_api():
+            nonlocal cursor
+            params = {"after": cursor} if cursor else {}
+            response = await client.get("/api/meetings", params=params, headers=session_headers)
+            if response.status_code == 200:
+                cursor = response.json()["next_cursor"]
+            return response
+
+        ingest_headers = {
+            "Authorization": f"Bearer {args.ingest_token}",
+            "Content-Type": "application/x-ndjson",
+            "Content-Encoding": "gzip",
+        }
+        ingest_meeting_id = str(uuid.uuid4())
+        log_ids = itertools.count()
+
+        async def ingest():
+            logged_at = datetime.now().isoformat()
+            body = "".join(json.dumps({
+                "user_id": INGEST_USER_ID, "user_fingerprint": "bench-device-ingest", "meeting_id": ingest_meeting_id,
+                "log_id": next(log_ids), "detector": "cheating_software", "log": "✅ Cheating software in not running",
+                "activity_status": "safe", "repeat_count": 1, "logged_at": logged_at,
+            }) + "\n" for _ in range(args.ingest_batch))
+            return await client.post("/api/ingest/user-logs", content=gzip.compress(body.encode("utf-8"), 6), headers=ingest_headers)
+
+        routes = {
+            "meetings": lambda: client.get("/meetings", headers=session_headers),
+            "meetings_api": meetings_api,
+            "report": lambda: client.get(f"/meeting-report/{report_meeting_id}", headers=session_headers),
+            "ingest": ingest,
+            "signin": lambda: client.post("/api/signin", json={"email": EMAIL, "password": PASSWORD}, headers=CSRF_HEADERS),
+        }
+        results = {}
+        try:
+            for name in args.routes:
+                await run_route(client, routes[name], args.concurrency, args.warmup)
+                results[name] = await run_route(client, routes[name], args.concurrency, args.duration)
+        finally:
+            if "ingest" in args.routes:
+                # keeps the data set the same from run to run
+                await asyncio.to_thread(delete_ingested)
+
+    return {
+        "benchmark": "http_routes",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "base_url": base_url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "meetings": args.meetings,
+        "report_logs": args.report_logs,
+        "ingest_batch": args.ingest_batch,
+        "server_workers": args.server_workers if args.serve else None,
+        "dataset": dataset,
+        "routes": results,
+    }
+
+
+# ---- Baseline -------------------------------------------------------
+def compare(result, baseline, max_regression):
+    """List the metrics of `result` that are more than `max_regression` worse than in `baseline`."""
+    regressions = []
+    for name, route in result["routes"].items():
+        before = baseline["routes"].get(name)
+        if not before:
+            continue
+        # (metric, current, baseline, +1 when higher is worse / -1 when lower is worse)
+        checks = [
+            ("requests_per_sec", route["requests_per_sec"], before["requests_per_sec"], -1),
+            ("latency_ms.p50", route["latency_ms"]["p50"], before["latency_ms"]["p50"], 1),
+            ("latency_ms.p99", route["latency_ms"]["p99"], before["latency_ms"]["p99"], 1),
+        ]
+        for metric, current, previous, worse in checks:
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous
+            if change * worse > max_regression:
+                regressions.append({"route": name, "metric": metric, "baseline": previous, "current": current, "change": round(change, 3)})
+        if route["errors"] and not before["errors"]:
+            regressions.append({"route": name, "metric": "errors", "baseline": 0, "current": route["errors"], "change": None})
+    return regressions
+
+
+def check_baseline(result, args):
+    if args.update_baseline or not os.path.exists(args.baseline):
+        with open(args.baseline, "w") as f:
+            f.write(json.dumps(result, indent=2) + "\n")
+        return True
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    mismatched = [key for key in SETTINGS if baseline.get(key) != result.get(key)]
+    if mismatched:
+        sys.exit(f"{args.baseline} was recorded with other {', '.join(mismatched)}; rerun with --update-baseline to replace it")
+    result["baseline"] = {
+        "file": args.baseline,
+        "timestamp": baseline["timestamp"],
+        "dataset": baseline.get("dataset"),
+        "max_regression": args.max_regression,
+        "regressions": compare(result, baseline, args.max_regression),
+    }
+    return not result["baseline"]["regressions"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--serve", action="store_true", help="start the app from this checkout instead of using --base-url")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers with --serve")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15, help="seconds per route")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds per route, not measured")
+    parser.add_argument("--meetings", type=int, default=20, help="meetings listed by /meetings")
+    parser.add_argument("--report-logs", type=int, default=5000, help="log rows in the meeting of the report route")
+    parser.add_argument("--ingest-batch", type=int, default=100, help="rows per ingestion request")
+    parser.add_argument("--ingest-token", default=os.getenv("INGEST_TOKEN"), help="the server's INGEST_TOKEN")
+    parser.add_argument("--routes", nargs="+", choices=ROUTES, default=["meetings", "report", "ingest", "signin"])
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare with, written when missing")
+    parser.add_argument("--update-baseline", action="store_true", help="overwrite --baseline with this run")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative change, 0.2 = 20%%")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if args.serve:
+        args.ingest_token = args.ingest_token or secrets.token_urlsafe(32)
+        server, base_url = start_server(args.server_workers, args.ingest_token)
+    elif "ingest" in args.routes and not args.ingest_token:
+        parser.error("the ingest route needs --ingest-token (or INGEST_TOKEN), or --serve")
+    try:
+        result = asyncio.run(run(args, base_url))
+    finally:
+        if server:
+            stop_server(server)
+
+    passed = check_baseline(result, args) if args.baseline else True
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
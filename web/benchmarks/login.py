@@ -0,0 +1,117 @@
+"""Login throughput of the password hasher and what it costs the event loop.
+
+Runs --concurrency simulated sign-ins (one Argon2 verify each) back to back
+for --duration seconds, once per mode:
+
+  inline  verify on the event loop, as the handlers used to
+  pool    verify through helpers.security.PasswordHasher's worker pool
+
+While they run, a ticker task sleeps --tick seconds in a loop and records
+how late it wakes up; that lag is what every other request on the worker
+waits on top of its own work. Argon2 parameters and pool size come from
+the same environment variables as the app (ARGON2_*, HASH_WORKERS).
+
+    cd web && python -m benchmarks.login --concurrency 20 --duration 10
+
+For requests/sec of the whole /api/signin route see benchmarks.http_routes.
+"""
+import json
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from helpers.security import (
+    PasswordHasher, ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM, HASH_WORKERS,
+)
+
+
+PASSWORD = "benchmark-password"
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(int(round(q / 100 * (len(values) - 1))), len(values) - 1)
+    return values[index]
+
+
+def ms(value):
+    return round(value * 1000, 3) if value is not None else None
+
+
+async def measure(verify, concurrency, duration, tick):
+    latencies = []
+    lags = []
+    deadline = time.monotonic() + duration
+
+    async def login():
+        while time.monotonic() < deadline:
+            started_at = time.perf_counter()
+            await verify()
+            latencies.append(time.perf_counter() - started_at)
+
+    async def ticker():
+        while time.monotonic() < deadline:
+            started_at = time.perf_counter()
+            await asyncio.sleep(tick)
+            lags.append(time.perf_counter() - started_at - tick)
+
+    started_at = time.monotonic()
+    await asyncio.gather(ticker(), *(login() for _ in range(concurrency)))
+    elapsed = time.monotonic() - started_at
+    return {
+        "logins": len(latencies),
+        "logins_per_sec": round(len(latencies) / elapsed, 2),
+        "login_latency_ms": {"p50": ms(percentile(latencies, 50)), "p99": ms(percentile(latencies, 99))},
+        "loop_lag_ms": {"p50": ms(percentile(lags, 50)), "p99": ms(percentile(lags, 99)), "max": ms(max(lags) if lags else None)},
+    }
+
+
+async def run(args):
+    hasher = PasswordHasher(args.time_cost, args.memory_cost, args.parallelism, args.workers, max_pending=args.concurrency)
+    stored_hash = hasher.context.hash(PASSWORD)
+
+    async def inline():
+        hasher.context.verify(PASSWORD, stored_hash)
+
+    async def pool():
+        await hasher.verify(PASSWORD, stored_hash)
+
+    modes = {"inline": inline, "pool": pool}
+    results = {name: await measure(modes[name], args.concurrency, args.duration, args.tick) for name in args.modes}
+    hasher.executor.shutdown()
+    return {
+        "benchmark": "login",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "argon2": {"time_cost": args.time_cost, "memory_cost_kib": args.memory_cost, "parallelism": args.parallelism},
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "modes": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per mode")
+    parser.add_argument("--tick", type=float, default=0.01, help="ticker interval in seconds")
+    parser.add_argument("--time-cost", type=int, default=ARGON2_TIME_COST)
+    parser.add_argument("--memory-cost", type=int, default=ARGON2_MEMORY_COST, help="KiB")
+    parser.add_argument("--parallelism", type=int, default=ARGON2_PARALLELISM)
+    parser.add_argument("--workers", type=int, default=HASH_WORKERS)
+    parser.add_argument("--modes", nargs="+", choices=("inline", "pool"), default=["inline", "pool"])
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report = json.dumps(result, indent=2)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Seed the database with production-sized volumes for benchmarks.
+
+Adds clients, meetings spread over them and user_logs rows spread over
+those meetings until the seeded counts reach --clients, --meetings and
+--logs; running it again with the same numbers does nothing, with bigger
+ones it adds the difference. Rows are generated by Postgres itself
+(INSERT ... SELECT from generate_series) in chunks of --chunk rows, so
+even the 100M-row scale is a matter of disk and patience, not of this
+process's memory:
+
+    cd web && python -m benchmarks.seed --clients 10000 --meetings 1000000 --logs 100000000
+
+Seeded clients are bench-<n>@example.com and can't sign in; the account
+benchmarks.http_routes signs in with is created separately. Log rows
+belong to user_id "bench-seed", --logs-per-meeting rows per meeting, one
+second apart from yesterday on, mostly "safe" with a share of warnings
+and dangers like a real session. The live-event trigger is skipped for
+them when the database user is allowed to (superuser).
+
+Run jobs.user_logs_maintenance afterwards if the rows reach past the
+existing daily partitions; until then they sit in user_logs_default.
+"""
+import json
+import time
+import logging
+import argparse
+from datetime import datetime
+from sqlalchemy import select, func, text, insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from models.db import engine, Client, Meeting
+
+
+CLIENT_EMAIL = "bench-%@example.com"
+LOG_USER_ID = "bench-seed"
+DEVICES = 1000 # distinct user_fingerprint values among seeded rows
+
+INSERT_CLIENTS_SQL = """
+    INSERT INTO clients (id, first_name, last_name, email, password_hash)
+    SELECT gen_random_uuid(), 'Seeded', 'Client ' || n, 'bench-' || lpad(n::text, 8, '0') || '@example.com', '!'
+    FROM generate_series(:start, :stop - 1) AS n
+    ON CONFLICT (email) DO NOTHING
+"""
+
+# meetings are dealt out to seeded clients round-robin, newest last
+INSERT_MEETINGS_SQL = """
+    WITH seeded_clients AS (
+        SELECT id, row_number() OVER (ORDER BY email) - 1 AS n
+        FROM clients WHERE email LIKE :pattern
+    )
+    INSERT INTO meetings (id, client_id, title, interviewee_name, interviewee_email, interviewer_name, interviewer_email, meeting_url, created_at, updated_at)
+    SELECT gen_random_uuid(), c.id, 'Seeded meeting ' || g, 'Candidate ' || g, 'candidate@example.com',
+           'Interviewer', 'interviewer@example.com', 'https://zoom.us/j/' || g,
+           now() - (:total - g) * interval '1 minute', now() - (:total - g) * interval '1 minute'
+    FROM generate_series(:start, :stop - 1) AS g
+    JOIN seeded_clients c ON c.n = g % :clients
+"""
+
+INSERT_LOGS_SQL = """
+    INSERT INTO user_logs (user_id, user_fingerprint, meeting_id, log_id, detector, log, activity_status, repeat_count, logged_at, created_at)
+    SELECT :user_id, 'bench-device-' || (m.n % :devices), m.meeting_id, g,
+           CASE WHEN g % 2 = 0 THEN 'cheating_software' ELSE 'browser' END,
+           CASE WHEN g % 50 = 0 THEN '❌ Cluely is running'
+                WHEN g % 50 = 1 THEN '⚠️ Left the Zoom tab'
+                WHEN g % 2 = 0 THEN '✅ Cheating software in not running'
+                ELSE '✅ Zoom tab is active' END,
+           CASE WHEN g % 50 = 0 THEN 'danger' WHEN g % 50 = 1 THEN 'warning' ELSE 'safe' END,
+           1 + g % 5,
+           date_trunc('day', now()) - interval '1 day' + (m.n % 1440) * interval '1 minute' + (g % :per_meeting) * interval '1 second',
+           now()
+    FROM generate_series(:start, :stop - 1) AS g
+    JOIN seeded_meetings m ON m.n = (g / :per_meeting) % :meetings
+"""
+
+
+def seeded_counts(db):
+    client_ids = select(Client.id).where(Client.email.like(CLIENT_EMAIL))
+    return {
+        "clients": db.scalar(select(func.count()).select_from(client_ids.subquery())),
+        "meetings": db.scalar(select(func.count()).select_from(Meeting).where(Meeting.client_id.in_(client_ids))),
+        "logs": db.scalar(text("SELECT count(*) FROM user_logs WHERE user_id = :user_id"), {"user_id": LOG_USER_ID}),
+    }
+
+
+def insert_in_chunks(conn, name, sql, start, stop, chunk, params):
+    """Run `sql` for [start, stop) in chunks of `chunk` rows, one transaction each."""
+    for chunk_start in range(start, stop, chunk):
+        chunk_stop = min(chunk_start + chunk, stop)
+        started_at = time.perf_counter()
+        with conn.begin():
+            conn.execute(text(sql), {**params, "start": chunk_start, "stop": chunk_stop})
+        logging.info(f"{name}: {chunk_stop}/{stop} ({time.perf_counter() - started_at:.1f}s)")
+
+
+def skip_notify_trigger(conn) -> bool:
+    """Stop this connection's inserts from firing triggers; superusers only."""
+    try:
+        with conn.begin():
+            conn.execute(text("SET session_replication_role = replica"))
+        return True
+    except DBAPIError:
+        logging.warning("Not allowed to skip the user_logs NOTIFY trigger, seeding with it")
+        return False
+
+
+def seed(clients, meetings, logs, logs_per_meeting, chunk):
+    if meetings and not clients:
+        raise SystemExit("--meetings needs --clients to own them")
+    if logs and not meetings:
+        raise SystemExit("--logs needs --meetings to put them in")
+    with Session(engine) as db:
+        before = seeded_counts(db)
+
+    with engine.connect() as conn:
+        if clients > before["clients"]:
+            insert_in_chunks(conn, "clients", INSERT_CLIENTS_SQL, before["clients"], clients, chunk, {})
+        if meetings > before["meetings"]:
+            insert_in_chunks(
+                conn, "meetings", INSERT_MEETINGS_SQL, before["meetings"], meetings, chunk,
+                {"pattern": CLIENT_EMAIL, "clients": clients, "total": meetings},
+            )
+        if logs > before["logs"]:
+            with conn.begin():
+                conn.execute(text("""
+                    CREATE TEMP TABLE seeded_meetings AS
+                    SELECT m.id::text AS meeting_id, row_number() OVER (ORDER BY m.created_at, m.id) - 1 AS n
+                    FROM meetings m JOIN clients c ON c.id = m.client_id
+                    WHERE c.email LIKE :pattern
+                """), {"pattern": CLIENT_EMAIL})
+                conn.execute(text("CREATE INDEX ON seeded_meetings (n)"))
+                conn.execute(text("ANALYZE seeded_meetings"))
+            # nobody listens for seeded rows, one NOTIFY per row would only slow the inserts down
+            skipped = skip_notify_trigger(conn)
+            insert_in_chunks(
+                conn, "user_logs", INSERT_LOGS_SQL, before["logs"], logs, chunk,
+                {"user_id": LOG_USER_ID, "devices": DEVICES, "per_meeting": logs_per_meeting, "meetings": meetings},
+            )
+            if skipped:
+                # the setting would otherwise stay on the pooled connection
+                conn.invalidate()
+    with engine.begin() as conn:
+        for table in ("clients", "meetings", "user_logs"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+    with Session(engine) as db:
+        return before, seeded_counts(db)
+
+
+def seed_account_meetings(email, count):
+    """Give the account `email` at least `count` meetings."""
+    with Session(engine) as db:
+        client_id = db.scalar(select(Client.id).where(Client.email == email))
+        existing = db.scalar(select(func.count()).select_from(Meeting).where(Meeting.client_id == client_id))
+        rows = [
+            dict(
+                client_id=client_id, title=f"Benchmark meeting {n}",
+                interviewee_name="Candidate", interviewee_email="candidate@example.com",
+                interviewer_name="Interviewer", interviewer_email="interviewer@example.com",
+                meeting_url="https://zoom.us/j/0",
+            )
+            for n in range(existing, count)
+        ]
+        for start in range(0, len(rows), 5000):
+            db.execute(insert(Meeting), rows[start:start + 5000])
+        db.commit()
+
+
+def seed_meeting_logs(email, count) -> str:
+    """Give the newest meeting of the account `email` at least `count` log rows and return its id."""
+    with engine.begin() as conn:
+        meeting_id = conn.scalar(
+            select(Meeting.id).join(Client, Client.id == Meeting.client_id)
+            .where(Client.email == email).order_by(Meeting.created_at.desc(), Meeting.id.desc()).limit(1)
+        )
+        if meeting_id is None:
+            raise SystemExit(f"{email} has no meetings to put logs in")
+        params = {"meeting_id": str(meeting_id), "user_id": "bench-report", "count": count}
+        params["existing"] = conn.scalar(text("SELECT count(*) FROM user_logs WHERE meeting_id = :meeting_id AND user_id = :user_id"), params)
+        conn.execute(text("""
+            INSERT INTO user_logs (user_id, user_fingerprint, meeting_id, log_id, detector, log, activity_status, logged_at, created_at)
+            SELECT :user_id, 'bench-device-report', :meeting_id, g, 'cheating_software',
+                   CASE WHEN g % 50 = 0 THEN '❌ Cluely is running' ELSE '✅ Cheating software in not running' END,
+                   CASE WHEN g % 50 = 0 THEN 'danger' ELSE 'safe' END,
+                   date_trunc('day', now()) - interval '1 day' + g * interval '1 second', now()
+            FROM generate_series(:existing, :count - 1) AS g
+        """), params)
+    return str(meeting_id)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--meetings", type=int, default=100000)
+    parser.add_argument("--logs", type=int, default=1000000, help="user_logs rows")
+    parser.add_argument("--logs-per-meeting", type=int, default=3600, help="an hour at one row per second")
+    parser.add_argument("--chunk", type=int, default=200000, help="rows per INSERT and transaction")
+    args = parser.parse_args()
+
+    started_at = time.perf_counter()
+    before, after = seed(args.clients, args.meetings, args.logs, args.logs_per_meeting, args.chunk)
+    print(json.dumps({
+        "benchmark": "seed",
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "before": before,
+        "after": after,
+        "seconds": round(time.perf_counter() - started_at, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
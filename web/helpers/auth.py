@@ -1,8 +1,19 @@
+import os
+import uuid
 from typing import Optional
 from fastapi import Request, Response, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db import AsyncSessionLocal, Client, ClientSnapshot
+from helpers.cache import TTLCache
 
 
 SESSION_KEY = "user_id"
+# Snapshots are invalidated on account updates in this process; other
+# workers see a change once their entry is USER_CACHE_TTL seconds old.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60)) # 1min
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+user_cache = TTLCache(ttl=USER_CACHE_TTL, max_size=USER_CACHE_SIZE)
 
 def login_user(response: Response, request: Request, user_id: str):
     """Store user id in session."""
@@ -22,3 +33,43 @@ def require_user(request: Request) -> str:
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     return user_id
+
+async def get_client(db: AsyncSession, user_id: Optional[str]) -> Optional[Client]:
+    """Load the Client row for a session user id, or None for a missing or malformed id."""
+    try:
+        return await db.get(Client, uuid.UUID(user_id)) if user_id else None
+    except ValueError:
+        return None
+
+async def current_user(request: Request) -> Optional[ClientSnapshot]:
+    """Return the signed-in client, or None.
+
+    Anonymous requests return before any database work, and signed-in
+    ones are served from `user_cache` after the first lookup.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    if not user_id:
+        return None
+
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    async with AsyncSessionLocal() as db:
+        client = await get_client(db, user_id)
+    if client is None:
+        return None
+    user = ClientSnapshot.model_validate(client)
+    user_cache.set(user_id, user)
+    return user
+
+async def require_current_user(request: Request) -> ClientSnapshot:
+    """Raise 401 unless a known client is signed in, otherwise return it."""
+    user = await current_user(request)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return user
+
+def invalidate_user(user_id: str):
+    """Call after changing a Client row so the next request reloads it."""
+    user_cache.invalidate(str(user_id))
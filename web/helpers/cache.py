@@ -0,0 +1,53 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after `ttl` seconds."""
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.data = OrderedDict() # key -> (expires_at, value)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self.data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.misses += 1
+                return default
+            self.data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return a value even if it has expired, without counting a hit or miss."""
+        with self.lock:
+            entry = self.data.get(key)
+            return entry[1] if entry else None
+
+    def set(self, key: Hashable, value: Any):
+        with self.lock:
+            self.data[key] = (time.monotonic() + self.ttl, value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_size:
+                self.data.popitem(last=False)
+
+    def expire(self, key: Hashable):
+        """Mark an entry stale but keep its value available to `peek`."""
+        with self.lock:
+            entry = self.data.get(key)
+            if entry:
+                self.data[key] = (0, entry[1])
+
+    def invalidate(self, key: Hashable):
+        with self.lock:
+            self.data.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self.data), "hits": self.hits, "misses": self.misses}
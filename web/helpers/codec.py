@@ -0,0 +1,258 @@
+"""Compact binary encoding of monitor log events.
+
+The same file lives in app/helpers and web/helpers: the desktop encodes
+with it and the ingestion endpoint decodes with it. Change both copies
+together (web/tests/test_shared_modules.py fails while they differ) and
+bump VERSION whenever the layout changes; a decoder rejects batches of
+any other version.
+
+Layout of a batch, version 1:
+
+    header   struct "<2sBqI": MAGIC, VERSION, base time in microseconds
+             since 1970-01-01 (datetimes are naive, as the monitor writes
+             them), number of events
+    strings  varint count, then a varint byte length and UTF-8 bytes per
+             string; index 0 stands for None and is not stored
+    events   struct "<BB" flags and status code, then varints: user_id,
+             user_fingerprint, meeting_id, detector and log as string
+             indexes, the status as a string index when its code is
+             STATUS_OTHER, log_id as a zigzag delta from the previous
+             event, repeat_count, logged_at as a zigzag delta in
+             microseconds from the previous event, then when flagged
+             last_logged_at - logged_at and created_at - logged_at, both
+             zigzag
+
+Every event of a meeting repeats the same ids, detector names and a
+handful of messages, so each distinct string is stored once per batch;
+consecutive events are a few ids and seconds apart, so the deltas mostly
+fit in one or two bytes.
+"""
+import struct
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+
+MAGIC = b"ME"
+VERSION = 1
+MEDIA_TYPE = "application/vnd.meeting-events"
+
+HEADER = struct.Struct("<2sBqI")
+EVENT_HEADER = struct.Struct("<BB")
+
+STATUS_CODES = {"safe": 0, "warning": 1, "danger": 2}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+STATUS_OTHER = 255
+
+HAS_LAST_LOGGED_AT = 1
+HAS_CREATED_AT = 2
+
+MAX_VARINT_BYTES = 10 # a 64-bit value
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class CodecError(ValueError):
+    """The batch is truncated, corrupt or of an unknown version."""
+
+
+class LogEvent:
+    """One monitor log row; the same fields as a spooled row dict."""
+    __slots__ = (
+        "user_id", "user_fingerprint", "meeting_id", "log_id", "detector", "log",
+        "activity_status", "repeat_count", "logged_at", "last_logged_at", "created_at",
+    )
+
+    def __init__(self, user_id, user_fingerprint, meeting_id, log_id, detector, log,
+                 activity_status, repeat_count=1, logged_at=None, last_logged_at=None, created_at=None):
+        self.user_id = user_id
+        self.user_fingerprint = user_fingerprint
+        self.meeting_id = meeting_id
+        self.log_id = log_id
+        self.detector = detector
+        self.log = log
+        self.activity_status = activity_status
+        self.repeat_count = repeat_count
+        self.logged_at = logged_at
+        self.last_logged_at = last_logged_at
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, row: dict) -> "LogEvent":
+        get = row.get
+        return cls(
+            get("user_id"), get("user_fingerprint"), get("meeting_id"), get("log_id"), get("detector"), get("log"),
+            get("activity_status"), get("repeat_count", 1), get("logged_at"), get("last_logged_at"), get("created_at"),
+        )
+
+    def as_row(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "user_fingerprint": self.user_fingerprint,
+            "meeting_id": self.meeting_id,
+            "log_id": self.log_id,
+            "detector": self.detector,
+            "log": self.log,
+            "activity_status": self.activity_status,
+            "repeat_count": self.repeat_count,
+            "logged_at": self.logged_at,
+            "last_logged_at": self.last_logged_at,
+            "created_at": self.created_at,
+        }
+
+    def __eq__(self, other):
+        return isinstance(other, LogEvent) and self.as_row() == other.as_row()
+
+    def __repr__(self):
+        return f"LogEvent({self.meeting_id!r}, {self.log_id!r}, {self.activity_status!r}, {self.logged_at!r})"
+
+
+# ---- Varints --------------------------------------------------------
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, pos: int):
+    byte = data[pos]
+    if byte < 0x80: # most indexes and deltas fit in one byte
+        return byte, pos + 1
+    result = 0
+    for shift in range(0, 7 * MAX_VARINT_BYTES, 7):
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+    raise CodecError(f"Varint longer than {MAX_VARINT_BYTES} bytes")
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+def _micros(value: datetime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+
+# ---- Batches --------------------------------------------------------
+def encode_batch(events: Iterable[LogEvent]) -> bytes:
+    events = list(events)
+    strings = {None: 0}
+    body = bytearray()
+
+    def intern(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    base = _micros(events[0].logged_at) if events else 0
+    last_log_id = 0
+    last_time = base
+    for event in events:
+        logged_at = _micros(event.logged_at)
+        flags = 0
+        if event.last_logged_at is not None:
+            flags |= HAS_LAST_LOGGED_AT
+        if event.created_at is not None:
+            flags |= HAS_CREATED_AT
+        status = STATUS_CODES.get(event.activity_status, STATUS_OTHER)
+
+        body += EVENT_HEADER.pack(flags, status)
+        _write_varint(body, intern(event.user_id))
+        _write_varint(body, intern(event.user_fingerprint))
+        _write_varint(body, intern(event.meeting_id))
+        _write_varint(body, intern(event.detector))
+        _write_varint(body, intern(event.log))
+        if status == STATUS_OTHER:
+            _write_varint(body, intern(event.activity_status))
+        _write_varint(body, _zigzag(event.log_id - last_log_id))
+        _write_varint(body, event.repeat_count)
+        _write_varint(body, _zigzag(logged_at - last_time))
+        if flags & HAS_LAST_LOGGED_AT:
+            _write_varint(body, _zigzag(_micros(event.last_logged_at) - logged_at))
+        if flags & HAS_CREATED_AT:
+            _write_varint(body, _zigzag(_micros(event.created_at) - logged_at))
+        last_log_id = event.log_id
+        last_time = logged_at
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, base, len(events)))
+    _write_varint(out, len(strings) - 1)
+    for value in list(strings)[1:]:
+        encoded = value.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+    return bytes(out + body)
+
+def decode_batch(data: bytes) -> List[LogEvent]:
+    try:
+        return _decode_batch(data)
+    except (IndexError, struct.error, UnicodeDecodeError, OverflowError) as e:
+        raise CodecError(f"Truncated or corrupt batch: {e}") from e
+
+def _decode_batch(data: bytes) -> List[LogEvent]:
+    magic, version, base, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CodecError("Not an event batch")
+    if version != VERSION:
+        raise CodecError(f"Unsupported batch version {version}, expected {VERSION}")
+
+    pos = HEADER.size
+    string_count, pos = _read_varint(data, pos)
+    strings = [None]
+    for _ in range(string_count):
+        length, pos = _read_varint(data, pos)
+        if pos + length > len(data):
+            raise CodecError("String table runs past the end of the batch")
+        strings.append(data[pos:pos + length].decode("utf-8"))
+        pos += length
+
+    events = []
+    last_log_id = 0
+    last_time = base
+    for _ in range(count):
+        flags, status = EVENT_HEADER.unpack_from(data, pos)
+        pos += EVENT_HEADER.size
+        user_id, pos = _read_varint(data, pos)
+        user_fingerprint, pos = _read_varint(data, pos)
+        meeting_id, pos = _read_varint(data, pos)
+        detector, pos = _read_varint(data, pos)
+        log, pos = _read_varint(data, pos)
+        if status == STATUS_OTHER:
+            activity_status, pos = _read_varint(data, pos)
+            activity_status = strings[activity_status]
+        else:
+            activity_status = STATUS_NAMES.get(status)
+            if activity_status is None:
+                raise CodecError(f"Unknown status code {status}")
+        log_id, pos = _read_varint(data, pos)
+        repeat_count, pos = _read_varint(data, pos)
+        logged_at, pos = _read_varint(data, pos)
+        last_log_id += _unzigzag(log_id)
+        last_time += _unzigzag(logged_at)
+
+        last_logged_at = created_at = None
+        if flags & HAS_LAST_LOGGED_AT:
+            offset, pos = _read_varint(data, pos)
+            last_logged_at = EPOCH + (last_time + _unzigzag(offset)) * MICROSECOND
+        if flags & HAS_CREATED_AT:
+            offset, pos = _read_varint(data, pos)
+            created_at = EPOCH + (last_time + _unzigzag(offset)) * MICROSECOND
+
+        events.append(LogEvent(
+            strings[user_id], strings[user_fingerprint], strings[meeting_id], last_log_id,
+            strings[detector], strings[log], activity_status, repeat_count,
+            EPOCH + last_time * MICROSECOND, last_logged_at, created_at,
+        ))
+    if pos != len(data):
+        raise CodecError(f"{len(data) - pos} bytes left over after {count} events")
+    return events
+
+def encode_rows(rows: Iterable[dict]) -> bytes:
+    return encode_batch(LogEvent.from_row(row) for row in rows)
+
+def decode_rows(data: bytes) -> List[dict]:
+    return [event.as_row() for event in decode_batch(data)]
@@ -0,0 +1,135 @@
+"""Streaming export of a meeting's raw user_logs rows as CSV or Parquet.
+
+Rows are read through a server-side cursor (`AsyncSession.stream` with
+`yield_per`) EXPORT_BATCH_ROWS at a time, and each batch is encoded and
+handed to the response before the next one is fetched, so memory stays
+flat however long the meeting ran. Encoding runs in a worker thread to
+keep the event loop free for other requests.
+
+Parquet gets one row group per batch; pyarrow is imported on the first
+Parquet export rather than at startup.
+"""
+import io
+import csv
+import asyncio
+from typing import AsyncIterator
+from sqlalchemy import select
+from models.db import AsyncSessionLocal, UserLogs
+
+
+EXPORT_BATCH_ROWS = 10000
+EXPORT_COLUMNS = (
+    UserLogs.id, UserLogs.user_id, UserLogs.user_fingerprint, UserLogs.meeting_id, UserLogs.log_id,
+    UserLogs.detector, UserLogs.log, UserLogs.activity_status, UserLogs.repeat_count,
+    UserLogs.logged_at, UserLogs.last_logged_at, UserLogs.created_at,
+)
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "parquet": "application/vnd.apache.parquet"}
+
+
+async def log_batches(meeting_id: str) -> AsyncIterator[list]:
+    # a session of its own: the stream outlives the request handler and its dependencies
+    async with AsyncSessionLocal() as db:
+        rows = await db.stream(
+            select(*EXPORT_COLUMNS)
+            .where(UserLogs.meeting_id == meeting_id)
+            .order_by(UserLogs.logged_at, UserLogs.id)
+            .execution_options(yield_per=EXPORT_BATCH_ROWS)
+        )
+        async for batch in rows.partitions():
+            yield batch
+
+
+# ---- CSV ------------------------------------------------------------
+class CsvEncoder:
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+        self.writer.writerow([column.key for column in EXPORT_COLUMNS])
+
+    def encode(self, batch) -> bytes:
+        self.writer.writerows(batch)
+        return self.drain()
+
+    def finish(self) -> bytes:
+        return self.drain()
+
+    def drain(self) -> bytes:
+        data = self.buffer.getvalue().encode("utf-8")
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+
+# ---- Parquet --------------------------------------------------------
+class ChunkSink:
+    """Write-only file object that hands out what was written since the last drain.
+
+    The Parquet writer records byte offsets through `tell`, so that keeps
+    counting from the start of the file while the data itself is dropped.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ParquetEncoder:
+    def __init__(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ("id", pa.int64()), ("user_id", pa.string()), ("user_fingerprint", pa.string()),
+            ("meeting_id", pa.string()), ("log_id", pa.int32()), ("detector", pa.string()),
+            ("log", pa.string()), ("activity_status", pa.string()), ("repeat_count", pa.int32()),
+            ("logged_at", pa.timestamp("us")), ("last_logged_at", pa.timestamp("us")), ("created_at", pa.timestamp("us")),
+        ])
+        self.sink = ChunkSink()
+        self.writer = pq.ParquetWriter(self.sink, self.schema, compression="zstd")
+
+    def encode(self, batch) -> bytes:
+        columns = list(zip(*batch))
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+EXPORT_ENCODERS = {"csv": CsvEncoder, "parquet": ParquetEncoder}
+
+
+async def export_logs(meeting_id: str, fmt: str) -> AsyncIterator[bytes]:
+    """Yield the encoded export of a meeting's logs, one chunk per batch of rows."""
+    encoder = await asyncio.to_thread(EXPORT_ENCODERS[fmt])
+    async for batch in log_batches(meeting_id):
+        chunk = await asyncio.to_thread(encoder.encode, batch)
+        if chunk:
+            yield chunk
+    yield await asyncio.to_thread(encoder.finish)
@@ -0,0 +1,136 @@
+import os
+import zlib
+import secrets
+from typing import List, Optional, Tuple
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db import UserLogs, UserLogIn, APIError
+from helpers import codec
+
+
+# ---- Ingestion config -----------------------------------------------
+INGEST_TOKEN = os.getenv("INGEST_TOKEN")
+MAX_BODY_BYTES = 5 * 1024 * 1024 # 5MB compressed
+MAX_DECOMPRESSED_BYTES = 50 * 1024 * 1024 # 50MB
+MAX_ROWS = 5000
+MAX_BIND_PARAMS = 32767 # asyncpg's limit per statement
+MAX_REPORTED_ERRORS = 20
+# same key as the desktop's DatabaseTransport, so a resent batch is a no-op
+CONFLICT_COLUMNS = ["user_id", "meeting_id", "log_id", "logged_at"]
+
+row_adapter = TypeAdapter(UserLogIn)
+rows_adapter = TypeAdapter(List[UserLogIn])
+
+
+class BatchError(Exception):
+    def __init__(self, status_code: int, errors: List[APIError]):
+        super().__init__(errors[0].message if errors else "")
+        self.status_code = status_code
+        self.errors = errors
+
+
+def check_token(authorization: Optional[str]) -> bool:
+    """Bearer token shared with the desktop clients (INGEST_TOKEN)."""
+    if not INGEST_TOKEN or not authorization or not authorization.startswith("Bearer "):
+        return False
+    return secrets.compare_digest(authorization[len("Bearer "):], INGEST_TOKEN)
+
+def decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    if len(body) > MAX_BODY_BYTES:
+        raise BatchError(413, [APIError(field="body", message=f"Body is larger than {MAX_BODY_BYTES} bytes.")])
+    if not content_encoding or content_encoding == "identity":
+        return body
+    if content_encoding != "gzip":
+        raise BatchError(400, [APIError(field="body", message=f"Unsupported Content-Encoding: {content_encoding}")])
+
+    # bounded, so a small gzip bomb cannot blow up the worker's memory
+    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    try:
+        data = decompressor.decompress(body, MAX_DECOMPRESSED_BYTES)
+    except zlib.error as e:
+        raise BatchError(400, [APIError(field="body", message=f"Invalid gzip body: {e}")])
+    if decompressor.unconsumed_tail:
+        raise BatchError(413, [APIError(field="body", message=f"Body is larger than {MAX_DECOMPRESSED_BYTES} bytes uncompressed.")])
+    return data
+
+def parse_batch(body: bytes, content_encoding: Optional[str] = None, content_type: Optional[str] = None) -> List[UserLogIn]:
+    """Decode and validate a (gzip-compressed) batch of log rows.
+
+    Every NDJSON line has to be exactly one row object, validated straight
+    from its bytes. A body of type `codec.MEDIA_TYPE` is decoded with
+    helpers/codec.py and its rows are validated in one call. Raises
+    BatchError with 1-based line (or event) numbers in the error fields.
+    """
+    data = decompress(body, content_encoding)
+    if content_type and content_type.split(";")[0].strip() == codec.MEDIA_TYPE:
+        return parse_events(data)
+
+    lines = [(number, line) for number, line in enumerate(data.split(b"\n"), 1) if line.strip()]
+    # one row per line, so this rejects an oversized batch before validating it
+    check_size(len(lines))
+    rows, errors = [], []
+    for number, line in lines:
+        try:
+            rows.append(row_adapter.validate_json(line))
+        except ValidationError as e:
+            errors.extend(line_errors(e, number))
+            if len(errors) >= MAX_REPORTED_ERRORS:
+                break
+    if errors:
+        raise BatchError(422, errors[:MAX_REPORTED_ERRORS])
+    check_size(len(rows))
+    return rows
+
+def parse_events(data: bytes) -> List[UserLogIn]:
+    try:
+        rows = codec.decode_rows(data)
+    except codec.CodecError as e:
+        raise BatchError(400, [APIError(field="body", message=str(e))])
+    check_size(len(rows))
+    try:
+        return rows_adapter.validate_python(rows)
+    except ValidationError as e:
+        raise BatchError(422, validation_errors(e, "event"))
+
+def check_size(rows: int):
+    if not rows:
+        raise BatchError(400, [APIError(field="body", message="Batch is empty.")])
+    if rows > MAX_ROWS:
+        raise BatchError(413, [APIError(field="body", message=f"Batch has more than {MAX_ROWS} rows.")])
+
+def validation_errors(e: ValidationError, unit: str) -> List[APIError]:
+    errors = []
+    for error in e.errors()[:MAX_REPORTED_ERRORS]:
+        loc = error["loc"]
+        if loc and isinstance(loc[0], int):
+            field = f"{unit} {loc[0] + 1}" + "".join(f".{part}" for part in loc[1:])
+        else:
+            field = "body"
+        errors.append(APIError(field=field, message=error["msg"]))
+    return errors
+
+def line_errors(e: ValidationError, number: int) -> List[APIError]:
+    return [
+        APIError(field=f"line {number}" + "".join(f".{part}" for part in error["loc"]), message=error["msg"])
+        for error in e.errors()
+    ]
+
+async def insert_batch(db: AsyncSession, rows: List[UserLogIn]) -> Tuple[int, List[str]]:
+    """Write a batch in one transaction and return (inserted, meeting_ids).
+
+    Each row binds one parameter per column, so a full batch is split into
+    as few multi-row INSERTs as fit under MAX_BIND_PARAMS.
+    """
+    values = [row.model_dump() for row in rows]
+    chunk_rows = MAX_BIND_PARAMS // len(values[0])
+    inserted = 0
+    try:
+        for start in range(0, len(values), chunk_rows):
+            stmt = postgresql.insert(UserLogs).values(values[start:start + chunk_rows]).on_conflict_do_nothing(index_elements=CONFLICT_COLUMNS)
+            inserted += (await db.execute(stmt)).rowcount
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return inserted, sorted({row.meeting_id for row in rows})
@@ -0,0 +1,183 @@
+"""Live fan-out of new user_logs rows to connected browsers.
+
+Postgres announces every inserted row on the `user_logs` channel (see
+migrations/versions/0004_user_logs_notify.py). One LISTEN connection per
+process is watched by the event loop itself (`add_reader`, no thread and
+no polling), and each notification is handed to the subscribers of its
+meeting. An idle subscriber is one small bounded queue, so thousands of
+open streams cost little.
+
+A subscriber that does not drain its queue is cut off instead of
+buffering without limit; its client reconnects with Last-Event-ID and
+catches up from the table, however much it missed (see `catch_up`).
+"""
+import json
+import asyncio
+import logging
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, Set
+import psycopg2
+import psycopg2.extensions
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db import engine, AsyncSessionLocal, UserLogs
+from helpers.report import invalidate_meeting_summary
+
+
+class Subscriber:
+    """One open stream: a bounded queue of events for a single meeting."""
+
+    def __init__(self, meeting_id: str, max_queue_size: int):
+        self.meeting_id = meeting_id
+        self.queue = asyncio.Queue(maxsize=max_queue_size)
+        self.overflowed = False
+
+    def push(self, event: dict):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class LogBroker:
+    CHANNEL = "user_logs"
+    MAX_QUEUE_SIZE = 256 # events buffered per subscriber
+    RECONNECT_DELAY = 1 # 1sec
+    MAX_RECONNECT_DELAY = 30 # 30sec
+
+    def __init__(self):
+        self.subscribers: Dict[str, Set[Subscriber]] = {}
+        self.connection = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.reconnect_task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.dropped = 0
+
+    # ---- Subscriptions ----------------------------------------------
+    def subscribe(self, meeting_id: str) -> Subscriber:
+        subscriber = Subscriber(meeting_id, self.MAX_QUEUE_SIZE)
+        self.subscribers.setdefault(meeting_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        subscribers = self.subscribers.get(subscriber.meeting_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscriber)
+        if not subscribers:
+            del self.subscribers[subscriber.meeting_id]
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self.subscribers.values())
+
+    def publish(self, event: dict):
+        meeting_id = event.get("meeting_id")
+        invalidate_meeting_summary(meeting_id)
+        for subscriber in list(self.subscribers.get(meeting_id, ())):
+            subscriber.push(event)
+            if subscriber.overflowed:
+                self.dropped += 1
+                self.unsubscribe(subscriber)
+        self.published += 1
+
+    # ---- LISTEN connection ------------------------------------------
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.reconnect_task = asyncio.create_task(self._connect())
+
+    async def stop(self):
+        if self.reconnect_task:
+            self.reconnect_task.cancel()
+        self._disconnect()
+
+    async def _connect(self):
+        delay = self.RECONNECT_DELAY
+        while True:
+            try:
+                self.connection = await asyncio.to_thread(self._open_connection)
+                self.loop.add_reader(self.connection.fileno(), self._on_readable)
+                logging.info(f"Listening for new rows on the {self.CHANNEL} channel")
+                return
+            except psycopg2.Error as e:
+                logging.error(f"Could not LISTEN on {self.CHANNEL}, retrying in {delay}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    def _open_connection(self):
+        url = engine.url
+        connection = psycopg2.connect(
+            host=url.host, port=url.port, user=url.username,
+            password=url.password, dbname=url.database,
+        )
+        connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {self.CHANNEL}")
+        return connection
+
+    def _disconnect(self):
+        if self.connection is None:
+            return
+        try:
+            self.loop.remove_reader(self.connection.fileno())
+        except (ValueError, psycopg2.Error):
+            pass
+        self.connection.close()
+        self.connection = None
+
+    def _on_readable(self):
+        try:
+            self.connection.poll()
+        except psycopg2.Error as e:
+            logging.error(f"Lost the {self.CHANNEL} LISTEN connection: {e}")
+            self._disconnect()
+            self.reconnect_task = asyncio.create_task(self._connect())
+            return
+
+        while self.connection.notifies:
+            notify = self.connection.notifies.pop(0)
+            try:
+                self.publish(json.loads(notify.payload))
+            except ValueError:
+                logging.error(f"Bad {self.CHANNEL} payload: {notify.payload[:200]}")
+
+
+broker = LogBroker()
+
+
+CATCH_UP_PAGE_SIZE = 1000
+
+async def catch_up(meeting_id: str, after_id: int, page_size: int = CATCH_UP_PAGE_SIZE) -> AsyncIterator[dict]:
+    """Rows a reconnecting client missed, in insertion order, as stream events.
+
+    Pages through them by id until it has caught up, each page on a session
+    of its own so no pooled connection is held while the client reads.
+    """
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (await db.scalars(
+                select(UserLogs)
+                .where(UserLogs.meeting_id == meeting_id, UserLogs.id > after_id)
+                .order_by(UserLogs.id)
+                .limit(page_size)
+            )).all()
+        for row in rows:
+            yield row_event(row)
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1].id
+
+def row_event(row) -> dict:
+    return {
+        "id": row.id,
+        "meeting_id": row.meeting_id,
+        "log_id": row.log_id,
+        "detector": row.detector,
+        "log": row.log,
+        "activity_status": row.activity_status,
+        "repeat_count": row.repeat_count,
+        "logged_at": row.logged_at.isoformat() if row.logged_at else None,
+        "last_logged_at": row.last_logged_at.isoformat() if row.last_logged_at else None,
+    }
+
+def format_sse(event: dict) -> str:
+    return f"id: {event['id']}\nevent: log\ndata: {json.dumps(event, default=datetime.isoformat)}\n\n"
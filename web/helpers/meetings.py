@@ -0,0 +1,40 @@
+import uuid
+from typing import Optional
+from sqlalchemy import String, cast, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db import Meeting, UserLogs
+from helpers.pagination import encode_cursor, decode_cursor
+
+
+async def meeting_page(db: AsyncSession, client_id: uuid.UUID, after: Optional[str] = None, limit: int = 50):
+    """Return (meetings, next_cursor) for one page of a client's meetings, newest first.
+
+    Seeks below the (created_at, id) of the previous page's last meeting on
+    the (client_id, created_at, id) index, so a page costs the same for a
+    client with ten meetings or fifty thousand, and at any depth.
+    """
+    query = select(Meeting).where(Meeting.client_id == client_id)
+    if after:
+        created_at, row_id = decode_cursor(after)
+        query = query.where(tuple_(Meeting.created_at, Meeting.id) < tuple_(created_at, uuid.UUID(row_id)))
+    query = query.order_by(Meeting.created_at.desc(), Meeting.id.desc()).limit(limit + 1)
+    meetings = (await db.scalars(query)).all()
+    next_cursor = encode_cursor(meetings[limit - 1].created_at, meetings[limit - 1].id) if len(meetings) > limit else None
+    return meetings[:limit], next_cursor
+
+async def device_meetings(db: AsyncSession, client_id: uuid.UUID, fingerprint: str, limit: int = 100):
+    """Return (meeting, first_seen_at, last_seen_at) for a client's meetings a device showed up in, latest first.
+
+    Starts from the (user_fingerprint, logged_at) index, so the cost follows
+    how much that device logged, not the size of user_logs.
+    """
+    last_seen_at = func.max(UserLogs.logged_at)
+    query = (
+        select(Meeting, func.min(UserLogs.logged_at), last_seen_at)
+        .join(UserLogs, UserLogs.meeting_id == cast(Meeting.id, String))
+        .where(UserLogs.user_fingerprint == fingerprint, Meeting.client_id == client_id)
+        .group_by(Meeting.id)
+        .order_by(last_seen_at.desc())
+        .limit(limit)
+    )
+    return (await db.execute(query)).all()
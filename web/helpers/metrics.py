@@ -0,0 +1,89 @@
+"""Prometheus metrics for the web service, served at /metrics.
+
+Request latency is recorded by `MetricsMiddleware`, a plain ASGI
+middleware, labelled with the route template rather than the raw path so
+ids in URLs do not create a series each. Caches, the live log broker, the
+password hasher and the connection pool already count what they do; they
+are read at scrape time by `StateCollector` instead of being updated on
+every request.
+
+Each worker process has its own registry, so with several uvicorn workers
+every scrape sees one of them.
+"""
+import time
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from models.db import async_engine
+from helpers.auth import user_cache
+from helpers.report import summary_cache
+from helpers.live import broker
+from helpers.security import password_hasher
+
+
+HTTP_REQUESTS = Counter("meeting_web_http_requests_total", "HTTP requests handled", ["method", "route", "status"])
+HTTP_LATENCY = Histogram(
+    "meeting_web_http_request_duration_seconds", "Time until the response headers were sent",
+    ["method", "route"], buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+INGEST_ROWS = Counter("meeting_web_ingest_rows_total", "Rows received by the ingestion endpoint", ["result"])
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # streamed responses (SSE) would otherwise count their whole lifetime
+                self.observe(scope, status_code, time.perf_counter() - started_at)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            self.observe(scope, status_code, time.perf_counter() - started_at)
+            raise
+
+    @staticmethod
+    def observe(scope, status_code, duration):
+        route = scope.get("route")
+        route = getattr(route, "path", "unmatched")
+        HTTP_REQUESTS.labels(scope["method"], route, status_code).inc()
+        HTTP_LATENCY.labels(scope["method"], route).observe(duration)
+
+
+class StateCollector:
+    def collect(self):
+        hits = CounterMetricFamily("meeting_web_cache_hits", "Cache lookups that found a fresh entry", labels=["cache"])
+        misses = CounterMetricFamily("meeting_web_cache_misses", "Cache lookups that did not", labels=["cache"])
+        entries = GaugeMetricFamily("meeting_web_cache_entries", "Entries held", labels=["cache"])
+        for name, cache in (("user", user_cache), ("summary", summary_cache)):
+            stats = cache.stats()
+            hits.add_metric([name], stats["hits"])
+            misses.add_metric([name], stats["misses"])
+            entries.add_metric([name], stats["size"])
+        yield from (hits, misses, entries)
+
+        yield GaugeMetricFamily("meeting_web_live_subscribers", "Open live log streams", value=broker.subscriber_count())
+        yield CounterMetricFamily("meeting_web_live_events_published", "Log rows fanned out to live streams", value=broker.published)
+        yield CounterMetricFamily("meeting_web_live_subscribers_dropped", "Live streams cut off for falling behind", value=broker.dropped)
+
+        yield GaugeMetricFamily("meeting_web_password_hash_pending", "Password hashes queued or running", value=password_hasher.pending)
+
+        pool = async_engine.pool
+        yield GaugeMetricFamily("meeting_web_db_pool_size", "Connections the pool keeps open", value=pool.size())
+        yield GaugeMetricFamily("meeting_web_db_pool_checked_out", "Connections in use", value=pool.checkedout())
+        yield GaugeMetricFamily("meeting_web_db_pool_overflow", "Connections open beyond the pool size", value=max(pool.overflow(), 0))
+
+
+REGISTRY.register(StateCollector())
@@ -0,0 +1,15 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+
+
+# Keyset cursors: the (timestamp, id) of the last row on a page, opaque to clients.
+def encode_cursor(position: datetime, row_id) -> str:
+    raw = f"{position.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Return (timestamp, id as text); raises ValueError for a malformed cursor."""
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    position, row_id = raw.split("|")
+    return datetime.fromisoformat(position), row_id
@@ -0,0 +1,228 @@
+import asyncio
+import weakref
+from collections import deque
+from datetime import timedelta
+from typing import Optional
+from sqlalchemy import or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db import UserLogs
+from helpers.cache import TTLCache
+from helpers.pagination import encode_cursor, decode_cursor
+
+
+ACTIVITY_STATUS_SAFE = "safe"
+STATUS_SEVERITY = {"safe": 0, "warning": 1, "danger": 2}
+
+SUMMARY_TTL = 30 # 30sec
+# rows logged this long before the latest one are read again on refresh, in
+# case a lower id committed after a higher one; covers a heartbeat's span
+SUMMARY_LATE_WINDOW = 600 # 10min
+SUMMARY_COLUMNS = (
+    UserLogs.id, UserLogs.detector, UserLogs.log, UserLogs.activity_status,
+    UserLogs.repeat_count, UserLogs.logged_at, UserLogs.last_logged_at,
+)
+
+
+# ---- Keyset pagination ----------------------------------------------
+async def log_page(db: AsyncSession, meeting_id: str, after: Optional[str] = None, limit: int = 100):
+    """Return (rows, next_cursor) for one page of a meeting's logs in time order.
+
+    Seeks past the (logged_at, id) of the previous page's last row instead of
+    using OFFSET, so every page costs the same on the (meeting_id, logged_at)
+    index however deep into the meeting it is.
+    """
+    query = select(UserLogs).where(UserLogs.meeting_id == meeting_id)
+    if after:
+        logged_at, row_id = decode_cursor(after)
+        query = query.where(tuple_(UserLogs.logged_at, UserLogs.id) > tuple_(logged_at, int(row_id)))
+    rows = (await db.scalars(query.order_by(UserLogs.logged_at, UserLogs.id).limit(limit + 1))).all()
+    next_cursor = encode_cursor(rows[limit - 1].logged_at, rows[limit - 1].id) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+# ---- Summary aggregates ---------------------------------------------
+class MeetingSummary:
+    """Running aggregates over a meeting's user_logs rows.
+
+    Rows are folded in once, in (logged_at, id) order; `last_id` and
+    `last_logged_at` remember how far the fold got, so a refresh only reads
+    rows added since, plus the rows of the last SUMMARY_LATE_WINDOW, whose
+    ids are kept in `recent_ids` so they are not folded twice.
+
+    A detector is in a status from the row that changed it until its next
+    change, or until the meeting's last log when it has not changed since
+    (the browser watcher only logs changes). Time per detector is kept in
+    `detector_seconds`; `status_seconds` counts the meeting's time by the
+    worst status any detector was in, so detectors running side by side do
+    not add up to more than the meeting's length.
+
+    Heartbeat rows start before rows other detectors wrote in the meantime
+    but never change their detector's status, so only status changes have
+    to arrive in time order; see `can_fold`.
+    """
+
+    def __init__(self):
+        self.last_id = 0
+        self.last_logged_at = None
+        self.first_logged_at = None
+        self.rows = 0
+        self.checks = {} # activity_status -> checks
+        self.status_seconds = {} # worst activity_status -> seconds, up to changed_at
+        self.detector_seconds = {} # detector -> {activity_status -> seconds}, closed states only
+        self.fired = {} # detector -> {log: checks}, non-safe results only
+        self.open = {} # detector -> [activity_status, started_at]
+        self.detector_logged_at = {} # detector -> logged_at of its latest row
+        self.changed_at = None # latest status change of any detector
+        self.worst = None # worst status of the open states since changed_at
+        self.recent_ids = set() # ids of the folded rows logged since late_since()
+
+    def fold(self, row):
+        count = row.repeat_count or 1
+        last_seen = row.last_logged_at or row.logged_at
+        detector = row.detector or ""
+
+        self.rows += 1
+        self.detector_logged_at[detector] = row.logged_at
+        self.last_id = max(self.last_id, row.id)
+        self.first_logged_at = self.first_logged_at or row.logged_at
+        self.last_logged_at = max(self.last_logged_at or last_seen, last_seen)
+        self.checks[row.activity_status] = self.checks.get(row.activity_status, 0) + count
+        if row.activity_status != ACTIVITY_STATUS_SAFE:
+            logs = self.fired.setdefault(detector, {})
+            logs[row.log] = logs.get(row.log, 0) + count
+
+        state = self.open.get(detector)
+        if state and state[0] == row.activity_status:
+            return
+        if state:
+            self._add_seconds(self.detector_seconds.setdefault(detector, {}), state[0], row.logged_at - state[1])
+        if self.changed_at is not None:
+            self._add_seconds(self.status_seconds, self.worst, row.logged_at - self.changed_at)
+        self.open[detector] = [row.activity_status, row.logged_at]
+        self.changed_at = row.logged_at
+        self.worst = worst_status(status for status, _ in self.open.values())
+
+    def can_fold(self, rows) -> bool:
+        """False if a row is older than one already folded for its detector,
+        or changes its detector's status before the latest change folded."""
+        statuses = {detector: state[0] for detector, state in self.open.items()}
+        changed_at = self.changed_at
+        for row in rows:
+            detector = row.detector or ""
+            latest = self.detector_logged_at.get(detector)
+            if latest and row.logged_at < latest:
+                return False
+            if detector not in statuses or statuses[detector] != row.activity_status:
+                if changed_at and row.logged_at < changed_at:
+                    return False
+                statuses[detector] = row.activity_status
+                changed_at = row.logged_at
+        return True
+
+    def late_since(self):
+        if self.last_logged_at is None:
+            return None
+        return self.last_logged_at - timedelta(seconds=SUMMARY_LATE_WINDOW)
+
+    def remember(self, rows):
+        """Keep the ids of the (id, logged_at) rows inside the late-row window."""
+        since = self.late_since()
+        self.recent_ids = {row.id for row in rows if row.logged_at >= since}
+
+    @staticmethod
+    def _add_seconds(totals, activity_status, delta):
+        totals[activity_status] = totals.get(activity_status, 0) + max(delta.total_seconds(), 0)
+
+    def as_dict(self) -> dict:
+        # open states last until the meeting's latest log, whichever detector wrote it
+        status_seconds = dict(self.status_seconds)
+        detector_seconds = {detector: dict(seconds) for detector, seconds in self.detector_seconds.items()}
+        if self.changed_at is not None:
+            self._add_seconds(status_seconds, self.worst, self.last_logged_at - self.changed_at)
+        for detector, (activity_status, started_at) in self.open.items():
+            self._add_seconds(detector_seconds.setdefault(detector, {}), activity_status, self.last_logged_at - started_at)
+        return {
+            "activity_status": worst_status(self.checks),
+            "first_logged_at": self.first_logged_at,
+            "last_logged_at": self.last_logged_at,
+            "rows": self.rows,
+            "checks": dict(self.checks),
+            "status_seconds": _round_seconds(status_seconds),
+            "detector_seconds": {detector: _round_seconds(seconds) for detector, seconds in detector_seconds.items()},
+            "detectors_fired": {detector: dict(logs) for detector, logs in self.fired.items()},
+        }
+
+
+def worst_status(statuses):
+    return max(statuses, key=lambda s: STATUS_SEVERITY.get(s, 0), default=None)
+
+def _round_seconds(seconds: dict) -> dict:
+    return {status: round(value, 3) for status, value in seconds.items()}
+
+
+summary_cache = TTLCache(ttl=SUMMARY_TTL, max_size=1000)
+# one refresh per meeting at a time, the stale entry is folded in place
+summary_locks = weakref.WeakValueDictionary() # meeting_id -> asyncio.Lock
+
+async def meeting_summary(db: AsyncSession, meeting_id: str) -> dict:
+    """Return summary aggregates for a meeting without rescanning it on every request.
+
+    A fresh cache entry is returned as is. A stale one is brought up to date
+    with the rows inserted since (by id) and the rows of the late-row window
+    it has not folded yet: ids are handed out before commit, so a lower one
+    can become visible after a higher one was read. Rows that arrive late,
+    older than rows already folded for their detector (e.g. replayed from a
+    client's spool after an outage), cannot be folded in order, so then the
+    meeting is recomputed once.
+    """
+    summary = summary_cache.get(meeting_id)
+    if summary is not None:
+        return summary.as_dict()
+
+    lock = summary_locks.setdefault(meeting_id, asyncio.Lock())
+    async with lock:
+        # a request that held the lock before may have refreshed it already
+        summary = summary_cache.get(meeting_id)
+        if summary is not None:
+            return summary.as_dict()
+        summary = await refresh_summary(db, meeting_id, summary_cache.peek(meeting_id))
+        summary_cache.set(meeting_id, summary)
+        return summary.as_dict()
+
+async def refresh_summary(db: AsyncSession, meeting_id: str, summary: Optional[MeetingSummary]) -> MeetingSummary:
+    if summary is not None:
+        since = summary.late_since()
+        unread = UserLogs.id > summary.last_id
+        rows = (await db.execute(
+            select(*SUMMARY_COLUMNS)
+            .where(UserLogs.meeting_id == meeting_id, or_(unread, UserLogs.logged_at >= since) if since else unread)
+            .order_by(UserLogs.logged_at, UserLogs.id)
+        )).all()
+        new_rows = [row for row in rows if row.id not in summary.recent_ids]
+        if not summary.can_fold(new_rows):
+            summary = None
+        else:
+            for row in new_rows:
+                summary.fold(row)
+            summary.remember(rows)
+
+    if summary is None:
+        summary = MeetingSummary()
+        rows = await db.stream(
+            select(*SUMMARY_COLUMNS)
+            .where(UserLogs.meeting_id == meeting_id)
+            .order_by(UserLogs.logged_at, UserLogs.id)
+            .execution_options(yield_per=1000)
+        )
+        recent = deque() # the streamed rows still inside the late-row window
+        async for row in rows:
+            summary.fold(row)
+            recent.append(row)
+            while recent[0].logged_at < summary.late_since():
+                recent.popleft()
+        summary.remember(recent)
+    return summary
+
+def invalidate_meeting_summary(meeting_id: str):
+    """Call after writing rows for a meeting; the next read folds them in."""
+    summary_cache.expire(meeting_id)
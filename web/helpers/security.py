@@ -1,22 +1,96 @@
+import os
+import asyncio
 import secrets
-from typing import Optional
-from passlib.hash import argon2
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from passlib.context import CryptContext
 
 # ---- CSRF config ----------------------------------------------------
 CSRF_COOKIE_NAME = "csrf_token"
 CSRF_HEADER_NAME = "X-CSRF-Token"
 
+# ---- Password hashing config ----------------------------------------
+# Argon2id cost, RFC 9106 second recommendation by default. Stored hashes
+# with other parameters are rehashed on the next successful sign-in.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 3))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 64 * 1024)) # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 4))
+# peak hashing memory is HASH_WORKERS * ARGON2_MEMORY_COST
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", 64))
+
 # ---- Password hashing -----------------------------------------------
-def hash_password(plain: str) -> str:
+class HasherBusy(Exception):
+    """Too many hashes are queued; the caller should retry later."""
+
+
+class PasswordHasher:
+    """Runs Argon2 in a bounded thread pool instead of on the event loop.
+
+    argon2-cffi releases the GIL while hashing, so threads run hashes in
+    parallel and the event loop keeps serving other requests. At most
+    `max_pending` hashes wait or run at once; beyond that HasherBusy is
+    raised rather than letting a burst of sign-ins queue without bound.
+    """
+
+    def __init__(self, time_cost: int, memory_cost: int, parallelism: int, workers: int, max_pending: int):
+        self.context = CryptContext(
+            schemes=["argon2"],
+            argon2__type="ID",
+            argon2__rounds=time_cost,
+            argon2__memory_cost=memory_cost,
+            argon2__parallelism=parallelism,
+        )
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self.max_pending = max_pending
+        self.pending = 0
+        # verified when the email is unknown, so a miss costs as much as a wrong password;
+        # made on the first miss, in a worker, so importing the app does not run Argon2
+        self.dummy_hash = None
+        self.dummy_hash_lock = threading.Lock()
+
+    async def _run(self, func, *args):
+        if self.pending >= self.max_pending:
+            raise HasherBusy()
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    def _get_dummy_hash(self) -> str:
+        with self.dummy_hash_lock:
+            if self.dummy_hash is None:
+                self.dummy_hash = self.context.hash(secrets.token_urlsafe(16))
+            return self.dummy_hash
+
+    def _verify_and_update(self, plain: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        try:
+            return self.context.verify_and_update(plain, hashed or self._get_dummy_hash())
+        except (ValueError, TypeError):
+            return False, None
+
+    async def hash(self, plain: str) -> str:
+        return await self._run(self.context.hash, plain)
+
+    async def verify(self, plain: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """Return (ok, new_hash); new_hash is set when the stored hash uses outdated parameters."""
+        ok, new_hash = await self._run(self._verify_and_update, plain, hashed)
+        if not hashed:
+            return False, None
+        return ok, new_hash
+
+
+password_hasher = PasswordHasher(ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM, HASH_WORKERS, HASH_MAX_PENDING)
+
+async def hash_password(plain: str) -> str:
     """Hash plain text password using Argon2."""
-    return argon2.hash(plain)
+    return await password_hasher.hash(plain)
 
-def verify_password(plain: str, hashed: str) -> bool:
-    """Verify password against stored hash."""
-    try:
-        return argon2.verify(plain, hashed)
-    except Exception:
-        return False
+async def verify_password(plain: str, hashed: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Verify password against stored hash; also returns a rehash when parameters changed."""
+    return await password_hasher.verify(plain, hashed)
 
 # ---- CSRF token helpers ---------------------------------------------
 def new_csrf_token() -> str:
@@ -0,0 +1,70 @@
+from typing import Iterable, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.db import UserLogs
+
+
+ACTIVITY_STATUS_SAFE = "safe"
+TIMELINE_COLUMNS = (
+    UserLogs.id, UserLogs.detector, UserLogs.log, UserLogs.activity_status,
+    UserLogs.repeat_count, UserLogs.logged_at, UserLogs.last_logged_at,
+)
+
+
+class Timeline:
+    """Rebuilds per-detector state intervals from change-only user_logs rows.
+
+    The monitor writes a row when a detector's result changes and heartbeat
+    rows for the repeats in between; each row says the same (activity_status,
+    log) was seen `repeat_count` times from `logged_at` to `last_logged_at`.
+    Consecutive rows of one detector with the same status and message are
+    merged, so every interval covers exactly the checks that produced it.
+    Rows must be added in `logged_at` order. Rows written before change-only
+    logging count as single checks.
+    """
+
+    def __init__(self):
+        self.intervals = []
+        self.current = {} # detector -> its open interval
+
+    def add(self, row):
+        detector = row.detector or ""
+        last_logged_at = row.last_logged_at or row.logged_at
+        interval = self.current.get(detector)
+        if interval and interval["activity_status"] == row.activity_status and interval["log"] == row.log:
+            interval["ended_at"] = max(interval["ended_at"], last_logged_at)
+            interval["checks"] += row.repeat_count or 1
+            return
+
+        interval = {
+            "detector": row.detector,
+            "activity_status": row.activity_status,
+            "log": row.log,
+            "started_at": row.logged_at,
+            "ended_at": last_logged_at,
+            "checks": row.repeat_count or 1,
+        }
+        self.current[detector] = interval
+        self.intervals.append(interval)
+
+
+def build_timeline(rows: Iterable) -> List[dict]:
+    timeline = Timeline()
+    for row in rows:
+        timeline.add(row)
+    return timeline.intervals
+
+async def meeting_timeline(db: AsyncSession, meeting_id: str, exclude_safe: bool = False) -> List[dict]:
+    """A meeting's state intervals in time order, read through a server-side cursor."""
+    timeline = Timeline()
+    rows = await db.stream(
+        select(*TIMELINE_COLUMNS)
+        .where(UserLogs.meeting_id == meeting_id)
+        .order_by(UserLogs.logged_at, UserLogs.id)
+        .execution_options(yield_per=1000)
+    )
+    async for row in rows:
+        timeline.add(row)
+    if exclude_safe:
+        return [interval for interval in timeline.intervals if interval["activity_status"] != ACTIVITY_STATUS_SAFE]
+    return timeline.intervals
@@ -0,0 +1,103 @@
+"""Partition upkeep, rollup and retention for user_logs.
+
+Meant to run once a day, e.g. from cron:
+
+    cd web && python -m jobs.user_logs_maintenance --retention-days 30
+
+1. creates the daily partitions for the next --days-ahead days,
+2. rolls raw rows older than --retention-days up into user_logs_minutely,
+3. drops the daily partitions it rolled up and deletes the rolled-up rows
+   from user_logs_default.
+
+Every partition is rolled up and dropped in one transaction, so a failed
+run can simply be repeated.
+"""
+import re
+import logging
+import argparse
+from datetime import date, datetime, timedelta
+from sqlalchemy import text
+from models.db import engine
+
+
+PARTITION_NAME = re.compile(r"^user_logs_p(\d{8})$")
+DEFAULT_PARTITION = "user_logs_default"
+
+# a raw row stands for repeat_count checks from logged_at to last_logged_at
+ROLLUP_SQL = """
+    INSERT INTO user_logs_minutely (meeting_id, user_id, minute, detector, activity_status, log, count, first_logged_at, last_logged_at)
+    SELECT COALESCE(meeting_id, ''), COALESCE(user_id, ''), date_trunc('minute', logged_at), COALESCE(detector, ''),
+           COALESCE(activity_status, ''), COALESCE(log, ''), sum(repeat_count), min(logged_at), max(COALESCE(last_logged_at, logged_at))
+    FROM {table}
+    WHERE logged_at < :cutoff
+    GROUP BY 1, 2, 3, 4, 5, 6
+    ON CONFLICT (meeting_id, user_id, minute, detector, activity_status, log) DO UPDATE SET
+        count = user_logs_minutely.count + EXCLUDED.count,
+        first_logged_at = LEAST(user_logs_minutely.first_logged_at, EXCLUDED.first_logged_at),
+        last_logged_at = GREATEST(user_logs_minutely.last_logged_at, EXCLUDED.last_logged_at)
+"""
+
+
+def list_partitions(conn):
+    rows = conn.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = 'user_logs'
+    """))
+    return [row[0] for row in rows]
+
+
+def ensure_partitions(days_ahead):
+    today = date.today()
+    for offset in range(days_ahead + 1):
+        day = today + timedelta(days=offset)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS user_logs_p{day:%Y%m%d} PARTITION OF user_logs "
+                    f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+                ))
+        except Exception as e:
+            # e.g. rows for that day already sit in the default partition
+            logging.error(f"Could not create partition for {day}: {e}")
+
+
+def rollup_and_drop(retention_days):
+    cutoff = datetime.combine(date.today() - timedelta(days=retention_days), datetime.min.time())
+    with engine.connect() as conn:
+        partitions = list_partitions(conn)
+
+    for name in sorted(partitions):
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        day = datetime.strptime(match.group(1), "%Y%m%d")
+        if day + timedelta(days=1) > cutoff:
+            continue
+        with engine.begin() as conn:
+            rolled_up = conn.execute(text(ROLLUP_SQL.format(table=name)), {"cutoff": cutoff}).rowcount
+            conn.execute(text(f"DROP TABLE {name}"))
+        logging.info(f"Rolled up {name} into {rolled_up} minute rows and dropped it")
+
+    if DEFAULT_PARTITION in partitions:
+        with engine.begin() as conn:
+            rolled_up = conn.execute(text(ROLLUP_SQL.format(table=DEFAULT_PARTITION)), {"cutoff": cutoff}).rowcount
+            deleted = conn.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE logged_at < :cutoff"), {"cutoff": cutoff}).rowcount
+        logging.info(f"Rolled up {deleted} rows from {DEFAULT_PARTITION} into {rolled_up} minute rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--retention-days", type=int, default=30, help="days of raw rows to keep")
+    parser.add_argument("--days-ahead", type=int, default=7, help="days of partitions to create in advance")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    ensure_partitions(args.days_ahead)
+    rollup_and_drop(args.retention_days)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,27 @@
 import os
-from fastapi import FastAPI, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
+import uuid
+import asyncio
+from fastapi import FastAPI, Request, Depends, HTTPException, Query, Header
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
-from models.db import get_session, Client, Meeting, SignupIn, SigninIn, AccountSettings, APIResponse, APIError
-from helpers.security import hash_password, verify_password, new_csrf_token, validate_csrf, CSRF_COOKIE_NAME, CSRF_HEADER_NAME
-from helpers.auth import login_user, logout_user, current_user_id, require_user
+from typing import List, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from models.db import get_session, AsyncSessionLocal, Client, Meeting, SignupIn, SigninIn, AccountSettings, APIResponse, APIError, ClientSnapshot, MeetingOut, MeetingPage, LogEntry, LogPage, MeetingSummaryOut, TimelineInterval, IngestResult, DeviceMeeting
+from helpers.security import HasherBusy, hash_password, verify_password, new_csrf_token, validate_csrf, CSRF_COOKIE_NAME, CSRF_HEADER_NAME
+from helpers.auth import login_user, logout_user, require_user, current_user, require_current_user, get_client, invalidate_user
+from helpers.meetings import meeting_page, device_meetings
+from helpers.report import log_page, meeting_summary, invalidate_meeting_summary
+from helpers.timeline import meeting_timeline
+from helpers.export import EXPORT_MEDIA_TYPES, export_logs
+from helpers.ingest import BatchError, check_token, parse_batch, insert_batch
+from helpers.live import broker, catch_up, format_sse
+from helpers.metrics import MetricsMiddleware, INGEST_ROWS
+from helpers.profiler import SamplingProfiler
 
 
 app = FastAPI()
@@ -23,6 +35,24 @@ app.add_middleware(
     https_only=False,   # set True in production
     session_cookie="session",
 )
+# outermost, so session handling is part of the measured latency
+app.add_middleware(MetricsMiddleware)
+
+# Opt-in sampling profiler, writes collapsed stacks to this file on shutdown
+PROFILE_FILE = os.getenv("PROFILE_FILE")
+profiler = SamplingProfiler(PROFILE_FILE) if PROFILE_FILE else None
+
+@app.on_event("startup")
+async def on_startup():
+    await broker.start()
+    if profiler:
+        profiler.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await broker.stop()
+    if profiler:
+        await asyncio.to_thread(profiler.stop)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
@@ -36,36 +66,29 @@ def ensure_csrf(request: Request):
 
 # ---- Pages ----------------------------------------------------------
 @app.get("/", response_class=HTMLResponse)
-async def home(request: Request, db: Session = Depends(get_session), user_id: str = Depends(current_user_id)):
-    user = db.query(Client).filter(Client.id == user_id).first()
+async def home(request: Request, user: Optional[ClientSnapshot] = Depends(current_user)):
     if user:
         return RedirectResponse(url="/meetings")
 
-    return templates.TemplateResponse(
-        "index.html", {
-            "request": request, 
-        }
-    )
+    return templates.TemplateResponse(request, "index.html")
 
 @app.get("/signup", response_class=HTMLResponse)
-async def singup(request: Request, db: Session = Depends(get_session), user_id: str = Depends(current_user_id)):
-    user = db.query(Client).filter(Client.id == user_id).first()
+async def singup(request: Request, user: Optional[ClientSnapshot] = Depends(current_user)):
     if user:
         return RedirectResponse(url="/meetings")
 
     token = new_csrf_token()
-    resp = templates.TemplateResponse("signup.html", {"request": request, "csrf_token": token})
+    resp = templates.TemplateResponse(request, "signup.html", {"csrf_token": token})
     resp.set_cookie(CSRF_COOKIE_NAME, token, samesite="Lax", secure=False, httponly=False, max_age=3600)
     return resp
 
 @app.get("/signin", response_class=HTMLResponse)
-async def signin(request: Request, db: Session = Depends(get_session), user_id: str = Depends(current_user_id)):
-    user = db.query(Client).filter(Client.id == user_id).first()
+async def signin(request: Request, user: Optional[ClientSnapshot] = Depends(current_user)):
     if user:
         return RedirectResponse(url="/meetings")
 
     token = new_csrf_token()
-    resp = templates.TemplateResponse("signin.html", {"request": request, "csrf_token": token})
+    resp = templates.TemplateResponse(request, "signin.html", {"csrf_token": token})
     resp.set_cookie(CSRF_COOKIE_NAME, token, samesite="Lax", secure=False, httponly=False, max_age=3600)
     return resp
 
@@ -77,11 +100,11 @@ async def signout(request: Request):
     return resp
 
 @app.post("/api/signup", response_model=APIResponse)
-async def api_signup(payload: SignupIn, request: Request, db: Session = Depends(get_session)):
+async def api_signup(payload: SignupIn, request: Request, db: AsyncSession = Depends(get_session)):
     ensure_csrf(request)
 
     errors: list[APIError] = []
-    existing = db.scalar(select(Client).where(Client.email == payload.email.lower()))
+    existing = await db.scalar(select(Client).where(Client.email == payload.email.lower()))
     if existing:
         errors.append(APIError(field="email", message="This email is already registered."))
         return JSONResponse(APIResponse(ok=False, errors=errors).model_dump())
@@ -90,17 +113,17 @@ async def api_signup(payload: SignupIn, request: Request, db: Session = Depends(
         first_name=payload.first_name,
         last_name=payload.last_name,
         email=payload.email.lower(),
-        password_hash=hash_password(payload.password),
+        password_hash=await hash_password(payload.password),
     )
     db.add(user)
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         # TODO: catch errors in another way
         return JSONResponse(APIResponse(ok=False, errors=[APIError(field="email", message="This email is already registered.")]).model_dump())
 
-    db.refresh(user)
+    await db.refresh(user)
     resp = JSONResponse(APIResponse(ok=True, redirect="/signin").model_dump())
     login_user(resp, request, str(user.id))
     new_token = new_csrf_token()
@@ -108,12 +131,17 @@ async def api_signup(payload: SignupIn, request: Request, db: Session = Depends(
     return resp
 
 @app.post("/api/signin", response_model=APIResponse)
-async def api_signin(payload: SigninIn, request: Request, db: Session = Depends(get_session)):
+async def api_signin(payload: SigninIn, request: Request, db: AsyncSession = Depends(get_session)):
     ensure_csrf(request)
 
-    user = db.scalar(select(Client).where(Client.email == payload.email.lower()))
-    if not user or not verify_password(payload.password, user.password_hash):
+    user = await db.scalar(select(Client).where(Client.email == payload.email.lower()))
+    ok, new_hash = await verify_password(payload.password, user.password_hash if user else None)
+    if not ok:
         return JSONResponse(APIResponse(ok=False, errors=[APIError(field="form", message="Invalid email or password.")]).model_dump())
+    if new_hash:
+        # stored with older Argon2 parameters, upgrade while we have the plain password
+        user.password_hash = new_hash
+        await db.commit()
 
     resp = JSONResponse(APIResponse(ok=True, redirect="/meetings").model_dump())
     login_user(resp, request, str(user.id))
@@ -122,74 +150,241 @@ async def api_signin(payload: SigninIn, request: Request, db: Session = Depends(
     return resp
 
 @app.get("/account-settings", response_class=HTMLResponse)
-async def account_settings(request: Request, user_id: str = Depends(require_user), db: Session = Depends(get_session)):
-    user = db.query(Client).filter(Client.id == user_id).first()
+async def account_settings(request: Request, user_id: str = Depends(require_user), user: Optional[ClientSnapshot] = Depends(current_user)):
     if not user:
         return RedirectResponse(url="/signin")
 
     return templates.TemplateResponse(
-        "account-settings.html", 
+        request,
+        "account-settings.html",
         {
-            "request": request,
             "user": user,
             "show_top_menu": True,
         }
     )
 
 @app.post("/api/account-settings", response_model=APIResponse)
-async def api_account_settings(payload: AccountSettings, request: Request, user_id: str = Depends(require_user), db: Session = Depends(get_session)):
+async def api_account_settings(payload: AccountSettings, request: Request, user_id: str = Depends(require_user), db: AsyncSession = Depends(get_session)):
     ensure_csrf(request)
 
-    user = db.query(Client).filter(Client.id == user_id).first()
+    user = await get_client(db, user_id)
     user.first_name = payload.first_name
     user.last_name = payload.last_name
     user.email = payload.email
     if payload.password:
-        user.password_hash = hash_password(payload.password)
+        user.password_hash = await hash_password(payload.password)
     db.add(user)
     try:
-        db.commit()
+        await db.commit()
     except IntegrityError:
-        db.rollback()
+        await db.rollback()
         # TODO: catch errors in another way
         return JSONResponse(APIResponse(ok=False, errors=[APIError(field="email", message="Internal Server Error")]).model_dump())
 
-    db.refresh(user)
+    await db.refresh(user)
+    invalidate_user(user_id)
 
     resp = JSONResponse(APIResponse(ok=True, redirect="/meetings").model_dump())
     return resp
 
 @app.get("/download", response_class=HTMLResponse)
 async def download(request: Request):
-    return templates.TemplateResponse("download.html", {"request": request})
+    return templates.TemplateResponse(request, "download.html")
+
+MEETINGS_PAGE_SIZE = 50
+MEETINGS_MAX_PAGE_SIZE = 500
 
 @app.get("/meetings", response_class=HTMLResponse)
-async def meetings(request: Request, user_id: str = Depends(require_user), db: Session = Depends(get_session)):
-    user = db.query(Client).filter(Client.id == user_id).first()
+async def meetings(request: Request, after: Optional[str] = None, user_id: str = Depends(require_user), user: Optional[ClientSnapshot] = Depends(current_user), db: AsyncSession = Depends(get_session)):
     if not user:
         return RedirectResponse(url="/signin")
     
-    meetings = db.query(Meeting).filter(Meeting.id == user_id).all()
+    try:
+        meetings, next_cursor = await meeting_page(db, user.id, after, MEETINGS_PAGE_SIZE)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
     return templates.TemplateResponse(
-        "meetings.html", 
+        request,
+        "meetings.html",
         {
-            "request": request, 
             "user_id": user_id,
             "user": user,
             "meetings": meetings,
+            "next_cursor": next_cursor,
             "show_top_menu": True,
         }
     )
 
+@app.get("/api/meetings", response_model=MeetingPage)
+async def api_meetings(after: Optional[str] = None, limit: int = Query(MEETINGS_PAGE_SIZE, ge=1, le=MEETINGS_MAX_PAGE_SIZE), user: ClientSnapshot = Depends(require_current_user), db: AsyncSession = Depends(get_session)):
+    try:
+        meetings, next_cursor = await meeting_page(db, user.id, after, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return MeetingPage(items=[MeetingOut.model_validate(meeting) for meeting in meetings], next_cursor=next_cursor)
+
 @app.get("/create-meeting", response_class=HTMLResponse)
 async def create_meeting(request: Request):
-    return templates.TemplateResponse("create-meeting.html", {"request": request})
+    return templates.TemplateResponse(request, "create-meeting.html")
+
+# ---- Meeting reports ------------------------------------------------
+REPORT_PAGE_SIZE = 100
+REPORT_MAX_PAGE_SIZE = 1000
+
+async def get_own_meeting(meeting_id: str, client_id: uuid.UUID, db: AsyncSession) -> Meeting:
+    try:
+        meeting_uuid = uuid.UUID(meeting_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+
+    meeting = await db.scalar(select(Meeting).where(Meeting.id == meeting_uuid, Meeting.client_id == client_id))
+    if not meeting:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    return meeting
+
+@app.get("/meeting-report/{meeting_id}", response_class=HTMLResponse)
+async def meeting_report(request: Request, meeting_id: str, after: Optional[str] = None, user_id: str = Depends(require_user), user: Optional[ClientSnapshot] = Depends(current_user), db: AsyncSession = Depends(get_session)):
+    if not user:
+        return RedirectResponse(url="/signin")
+
+    meeting = await get_own_meeting(meeting_id, user.id, db)
+    try:
+        logs, next_cursor = await log_page(db, meeting_id, after, REPORT_PAGE_SIZE)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return templates.TemplateResponse(
+        request,
+        "meeting-report.html",
+        {
+            "user": user,
+            "meeting": meeting,
+            "summary": await meeting_summary(db, meeting_id),
+            "logs": logs,
+            "next_cursor": next_cursor,
+            "show_top_menu": True,
+        }
+    )
+
+@app.get("/api/meetings/{meeting_id}/logs", response_model=LogPage)
+async def api_meeting_logs(meeting_id: str, after: Optional[str] = None, limit: int = Query(REPORT_PAGE_SIZE, ge=1, le=REPORT_MAX_PAGE_SIZE), user: ClientSnapshot = Depends(require_current_user), db: AsyncSession = Depends(get_session)):
+    await get_own_meeting(meeting_id, user.id, db)
+    try:
+        logs, next_cursor = await log_page(db, meeting_id, after, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return LogPage(items=[LogEntry.model_validate(row) for row in logs], next_cursor=next_cursor)
+
+@app.get("/api/meetings/{meeting_id}/summary", response_model=MeetingSummaryOut)
+async def api_meeting_summary(meeting_id: str, user: ClientSnapshot = Depends(require_current_user), db: AsyncSession = Depends(get_session)):
+    await get_own_meeting(meeting_id, user.id, db)
+    return MeetingSummaryOut(**await meeting_summary(db, meeting_id))
+
+@app.get("/api/meetings/{meeting_id}/timeline", response_model=List[TimelineInterval])
+async def api_meeting_timeline(meeting_id: str, exclude_safe: bool = False, user: ClientSnapshot = Depends(require_current_user), db: AsyncSession = Depends(get_session)):
+    """Per-detector state intervals of a meeting; exclude_safe leaves only the warnings and alerts."""
+    await get_own_meeting(meeting_id, user.id, db)
+    return await meeting_timeline(db, meeting_id, exclude_safe)
+
+@app.get("/api/devices/{fingerprint}/meetings", response_model=List[DeviceMeeting])
+async def api_device_meetings(fingerprint: str, limit: int = Query(100, ge=1, le=500), user: ClientSnapshot = Depends(require_current_user), db: AsyncSession = Depends(get_session)):
+    """The caller's meetings a device (user_fingerprint) showed up in."""
+    rows = await device_meetings(db, user.id, fingerprint, limit)
+    return [
+        DeviceMeeting(meeting=MeetingOut.model_validate(meeting), first_seen_at=first_seen_at, last_seen_at=last_seen_at)
+        for meeting, first_seen_at, last_seen_at in rows
+    ]
+
+@app.get("/api/meetings/{meeting_id}/export")
+async def api_meeting_export(meeting_id: str, format: str = Query("csv", pattern="^(csv|parquet)$"), user: ClientSnapshot = Depends(require_current_user), db: AsyncSession = Depends(get_session)):
+    """Every raw log row of a meeting as a CSV or Parquet download, streamed from a server-side cursor."""
+    meeting = await get_own_meeting(meeting_id, user.id, db)
+    filename = f"meeting-{meeting.id}-logs.{format}"
+    return StreamingResponse(
+        export_logs(meeting_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# ---- Ingestion ------------------------------------------------------
+@app.post("/api/ingest/user-logs", response_model=IngestResult)
+async def api_ingest_user_logs(request: Request, authorization: Optional[str] = Header(None), content_encoding: Optional[str] = Header(None), content_type: Optional[str] = Header(None), db: AsyncSession = Depends(get_session)):
+    """Batched log ingestion for desktop clients (see app/helpers/transport.py).
+
+    Takes NDJSON or binary event batches (helpers/codec.py), optionally
+    gzip-compressed, validates the whole batch and
+    writes it with one multi-row upsert, so resending a batch is harmless.
+    """
+    if not check_token(authorization):
+        raise HTTPException(status_code=401, detail="Invalid ingestion token")
+
+    try:
+        rows = parse_batch(await request.body(), content_encoding, content_type)
+    except BatchError as e:
+        return JSONResponse(IngestResult(ok=False, errors=e.errors).model_dump(), status_code=e.status_code)
+
+    inserted, meeting_ids = await insert_batch(db, rows)
+    INGEST_ROWS.labels("inserted").inc(inserted)
+    INGEST_ROWS.labels("duplicate").inc(len(rows) - inserted)
+    for meeting_id in meeting_ids:
+        invalidate_meeting_summary(meeting_id)
+    return IngestResult(ok=True, received=len(rows), inserted=inserted)
+
+# ---- Live events ----------------------------------------------------
+STREAM_HEARTBEAT = 15 # 15sec, keeps idle connections open through proxies
+STREAM_RETRY = 3000 # 3sec, EventSource reconnect delay
+
+@app.get("/api/meetings/{meeting_id}/events")
+async def api_meeting_events(meeting_id: str, last_event_id: Optional[str] = Header(None), user: ClientSnapshot = Depends(require_current_user)):
+    """Server-Sent Events stream of new log rows for a meeting.
+
+    Subscribes before catching up from Last-Event-ID so nothing falls in
+    between; events already sent by the catch-up are skipped. A client too
+    slow to keep up is disconnected and catches up on reconnect.
+    """
+    # not Depends(get_session): that would hold a pooled connection for as long as the stream is open
+    async with AsyncSessionLocal() as db:
+        await get_own_meeting(meeting_id, user.id, db)
+    last_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    subscriber = broker.subscribe(meeting_id)
+
+    async def stream():
+        sent_id = last_id or 0
+        try:
+            yield f"retry: {STREAM_RETRY}\n\n"
+            if last_id is not None:
+                async for event in catch_up(meeting_id, last_id):
+                    sent_id = event["id"]
+                    yield format_sse(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if subscriber.overflowed:
+                        break
+                    yield ": keep-alive\n\n"
+                    continue
+                if event["id"] > sent_id:
+                    yield format_sse(event)
+                if subscriber.overflowed and subscriber.queue.empty():
+                    break
+        finally:
+            broker.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ---- Metrics --------------------------------------------------------
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint; keep it off the public proxy."""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
-@app.get("/meeting-report", response_class=HTMLResponse)
-async def meeting_report(request: Request):
-    return templates.TemplateResponse("meeting-report.html", {"request": request})
+@app.exception_handler(HasherBusy)
+async def hasher_busy(request: Request, exc):
+    errors = [APIError(field="form", message="Too many requests, please try again in a moment.")]
+    return JSONResponse(APIResponse(ok=False, errors=errors).model_dump(), status_code=503, headers={"Retry-After": "1"})
 
 @app.exception_handler(404)
 async def not_found(request: Request, exc):
-    return templates.TemplateResponse("404.html", {"request": request}, status_code=404)
+    return templates.TemplateResponse(request, "404.html", status_code=404)
@@ -0,0 +1,62 @@
+"""Initial schema: clients and meetings
+
+Revision ID: 0001_initial
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+Databases created by the old import-time `create_all` already have these
+tables; they are left as they are and only stamped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_initial"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+
+    if not inspector.has_table("clients"):
+        op.create_table(
+            "clients",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("first_name", sa.String(80), nullable=False),
+            sa.Column("last_name", sa.String(80), nullable=False),
+            sa.Column("email", sa.String(254), nullable=False),
+            sa.Column("password_hash", sa.String(256), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_clients_id", "clients", ["id"])
+        op.create_index("ix_clients_email", "clients", ["email"], unique=True)
+
+    if not inspector.has_table("meetings"):
+        op.create_table(
+            "meetings",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("client_id", sa.String),
+            sa.Column("title", sa.String),
+            sa.Column("interviewee_name", sa.String),
+            sa.Column("interviewee_email", sa.String),
+            sa.Column("interviewer_name", sa.String),
+            sa.Column("interviewer_email", sa.String),
+            sa.Column("meeting_url", sa.String),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        )
+        op.create_index("ix_meetings_id", "meetings", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("meetings")
+    op.drop_table("clients")
@@ -0,0 +1,93 @@
+"""Partition user_logs by day, add lookup indexes and the per-minute rollup table
+
+Revision ID: 0002_user_logs_partitioning
+Revises: 0001_initial
+Create Date: 2026-10-18 12:10:00
+
+An existing unpartitioned user_logs (from the desktop app's old
+import-time `create_all`) is renamed, its rows are copied into the new
+partitioned table and it is dropped. Rows outside the pre-created daily
+partitions land in user_logs_default, which the maintenance job rolls up
+and prunes like any other partition.
+"""
+from datetime import date, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_user_logs_partitioning"
+down_revision: Union[str, Sequence[str], None] = "0001_initial"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITION_DAYS_AHEAD = 7
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    legacy = inspector.has_table("user_logs")
+    if legacy:
+        op.rename_table("user_logs", "user_logs_legacy")
+        # index names are schema-wide, free them for the new table
+        op.execute("DROP INDEX IF EXISTS ix_user_logs_id")
+        op.execute("ALTER TABLE user_logs_legacy DROP CONSTRAINT IF EXISTS uq_user_logs_user_meeting_log")
+
+    op.execute("""
+        CREATE TABLE user_logs (
+            id BIGINT GENERATED BY DEFAULT AS IDENTITY,
+            user_id VARCHAR,
+            user_fingerprint VARCHAR,
+            meeting_id VARCHAR,
+            log_id INTEGER,
+            log VARCHAR,
+            activity_status VARCHAR,
+            logged_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now(),
+            PRIMARY KEY (id, logged_at),
+            CONSTRAINT uq_user_logs_user_meeting_log UNIQUE (user_id, meeting_id, log_id, logged_at)
+        ) PARTITION BY RANGE (logged_at)
+    """)
+    op.execute("CREATE INDEX ix_user_logs_meeting_logged_at ON user_logs (meeting_id, logged_at)")
+    op.execute("CREATE INDEX ix_user_logs_user_logged_at ON user_logs (user_id, logged_at)")
+    op.execute("CREATE TABLE user_logs_default PARTITION OF user_logs DEFAULT")
+
+    today = date.today()
+    for offset in range(-1, PARTITION_DAYS_AHEAD + 1):
+        day = today + timedelta(days=offset)
+        op.execute(
+            f"CREATE TABLE user_logs_p{day:%Y%m%d} PARTITION OF user_logs "
+            f"FOR VALUES FROM ('{day.isoformat()}') TO ('{(day + timedelta(days=1)).isoformat()}')"
+        )
+
+    if legacy:
+        op.execute("""
+            INSERT INTO user_logs (user_id, user_fingerprint, meeting_id, log_id, log, activity_status, logged_at, created_at)
+            SELECT user_id, user_fingerprint, meeting_id, log_id, log, activity_status,
+                   COALESCE(logged_at, created_at, now()), created_at
+            FROM user_logs_legacy
+            ON CONFLICT DO NOTHING
+        """)
+        op.drop_table("user_logs_legacy")
+
+    op.create_table(
+        "user_logs_minutely",
+        sa.Column("meeting_id", sa.String, primary_key=True),
+        sa.Column("user_id", sa.String, primary_key=True),
+        sa.Column("minute", sa.DateTime, primary_key=True),
+        sa.Column("activity_status", sa.String, primary_key=True),
+        sa.Column("log", sa.String, primary_key=True),
+        sa.Column("count", sa.Integer, nullable=False),
+        sa.Column("first_logged_at", sa.DateTime, nullable=False),
+        sa.Column("last_logged_at", sa.DateTime, nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("user_logs_minutely")
+    # dropping the parent drops every partition with it
+    op.drop_table("user_logs")
@@ -0,0 +1,36 @@
+"""Store change-only logs: detector name, repeat count and span end on user_logs
+
+Revision ID: 0003_user_logs_run_length
+Revises: 0002_user_logs_partitioning
+Create Date: 2026-10-18 13:00:00
+
+The desktop monitor now writes one row per state change plus periodic
+heartbeats instead of one row per check. A row stands for `repeat_count`
+identical results between `logged_at` and `last_logged_at`; existing rows
+are single checks, which is what the defaults describe.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_user_logs_run_length"
+down_revision: Union[str, Sequence[str], None] = "0002_user_logs_partitioning"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("user_logs", sa.Column("detector", sa.String))
+    op.add_column("user_logs", sa.Column("repeat_count", sa.Integer, nullable=False, server_default="1"))
+    op.add_column("user_logs", sa.Column("last_logged_at", sa.DateTime))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("user_logs", "last_logged_at")
+    op.drop_column("user_logs", "repeat_count")
+    op.drop_column("user_logs", "detector")
@@ -0,0 +1,55 @@
+"""Announce new user_logs rows on the user_logs NOTIFY channel
+
+Revision ID: 0004_user_logs_notify
+Revises: 0003_user_logs_run_length
+Create Date: 2026-10-18 15:00:00
+
+Rows reach user_logs from the desktop spool replayer, not through the web
+app, so the web app learns about them from Postgres: an AFTER INSERT
+trigger sends each row as a JSON payload and helpers/live.py LISTENs once
+per process and fans the events out to connected browsers. The trigger is
+defined on the partitioned parent, so it applies to every partition.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_user_logs_notify"
+down_revision: Union[str, Sequence[str], None] = "0003_user_logs_run_length"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NOTIFY payloads are capped at 8000 bytes, so the free-text log is truncated
+    op.execute("""
+        CREATE FUNCTION user_logs_notify() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('user_logs', json_build_object(
+                'id', NEW.id,
+                'meeting_id', NEW.meeting_id,
+                'log_id', NEW.log_id,
+                'detector', NEW.detector,
+                'log', left(NEW.log, 1000),
+                'activity_status', NEW.activity_status,
+                'repeat_count', NEW.repeat_count,
+                'logged_at', NEW.logged_at,
+                'last_logged_at', NEW.last_logged_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER user_logs_notify AFTER INSERT ON user_logs
+        FOR EACH ROW EXECUTE FUNCTION user_logs_notify()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS user_logs_notify ON user_logs")
+    op.execute("DROP FUNCTION IF EXISTS user_logs_notify()")
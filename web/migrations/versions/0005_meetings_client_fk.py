@@ -0,0 +1,51 @@
+"""Make meetings.client_id a UUID foreign key and index it for listing
+
+Revision ID: 0005_meetings_client_fk
+Revises: 0004_user_logs_notify
+Create Date: 2026-10-18 18:00:00
+
+client_id was a free-form String without an index, so listing a client's
+meetings scanned the whole table. It becomes a UUID referencing clients
+with an index on (client_id, created_at, id), which serves the keyset
+pagination of /meetings and /api/meetings straight from the index.
+Values that are not UUIDs of an existing client cannot be converted and
+are set to NULL (the meeting then belongs to nobody).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_meetings_client_fk"
+down_revision: Union[str, Sequence[str], None] = "0004_user_logs_notify"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UUID_PATTERN = "^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(f"""
+        UPDATE meetings SET client_id = NULL
+        WHERE client_id IS NOT NULL
+          AND (client_id !~ '{UUID_PATTERN}'
+               OR NOT EXISTS (SELECT 1 FROM clients WHERE clients.id::text = lower(meetings.client_id)))
+    """)
+    op.alter_column(
+        "meetings", "client_id",
+        type_=postgresql.UUID(as_uuid=True),
+        postgresql_using="client_id::uuid",
+    )
+    op.create_foreign_key("fk_meetings_client_id", "meetings", "clients", ["client_id"], ["id"], ondelete="CASCADE")
+    op.create_index("ix_meetings_client_created_at", "meetings", ["client_id", "created_at", "id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_meetings_client_created_at", table_name="meetings")
+    op.drop_constraint("fk_meetings_client_id", "meetings", type_="foreignkey")
+    op.alter_column("meetings", "client_id", type_=sa.String, postgresql_using="client_id::text")
@@ -0,0 +1,31 @@
+"""Index user_logs on user_fingerprint for device lookups
+
+Revision ID: 0006_user_logs_fingerprint_index
+Revises: 0005_meetings_client_fk
+Create Date: 2026-10-18 21:00:00
+
+The desktop app now writes a real device fingerprint instead of a
+constant. Finding the meetings a device showed up in filters on it, and
+without an index that scans every partition. Created on the partitioned
+parent, so every existing and future partition gets its own index.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_user_logs_fingerprint_index"
+down_revision: Union[str, Sequence[str], None] = "0005_meetings_client_fk"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_user_logs_fingerprint_logged_at", "user_logs", ["user_fingerprint", "logged_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_user_logs_fingerprint_logged_at", table_name="user_logs")
@@ -0,0 +1,55 @@
+"""Keep the detector in the per-minute rollup of user_logs
+
+Revision ID: 0007_user_logs_minutely_detector
+Revises: 0006_user_logs_fingerprint_index
+Create Date: 2026-10-19 10:00:00
+
+Since 0003 a user_logs row stands for `repeat_count` checks of one
+detector from logged_at to last_logged_at. The rollup now sums
+repeat_count and keeps the span end (see jobs/user_logs_maintenance.py);
+for that to rebuild the timeline per detector, the detector becomes part
+of the rollup's primary key. Rows rolled up before have no detector and
+get ''.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_user_logs_minutely_detector"
+down_revision: Union[str, Sequence[str], None] = "0006_user_logs_fingerprint_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OLD_KEY = ["meeting_id", "user_id", "minute", "activity_status", "log"]
+NEW_KEY = ["meeting_id", "user_id", "minute", "detector", "activity_status", "log"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("user_logs_minutely", sa.Column("detector", sa.String, nullable=False, server_default=""))
+    op.drop_constraint("user_logs_minutely_pkey", "user_logs_minutely", type_="primary")
+    op.create_primary_key("user_logs_minutely_pkey", "user_logs_minutely", NEW_KEY)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # rows of different detectors in the same minute collapse into one
+    op.execute("""
+        CREATE TEMP TABLE user_logs_minutely_merged ON COMMIT DROP AS
+        SELECT meeting_id, user_id, minute, activity_status, log,
+               sum(count) AS count, min(first_logged_at) AS first_logged_at, max(last_logged_at) AS last_logged_at
+        FROM user_logs_minutely
+        GROUP BY meeting_id, user_id, minute, activity_status, log
+    """)
+    op.execute("DELETE FROM user_logs_minutely")
+    op.drop_constraint("user_logs_minutely_pkey", "user_logs_minutely", type_="primary")
+    op.drop_column("user_logs_minutely", "detector")
+    op.create_primary_key("user_logs_minutely_pkey", "user_logs_minutely", OLD_KEY)
+    op.execute("""
+        INSERT INTO user_logs_minutely (meeting_id, user_id, minute, activity_status, log, count, first_logged_at, last_logged_at)
+        SELECT meeting_id, user_id, minute, activity_status, log, count, first_logged_at, last_logged_at
+        FROM user_logs_minutely_merged
+    """)
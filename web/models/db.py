@@ -3,11 +3,12 @@ from contextlib import contextmanager
 from datetime import datetime as dt
 import os
 from dotenv import load_dotenv
-from sqlalchemy import Column, String, DateTime, func, create_engine
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, ForeignKey, Index, UniqueConstraint, func, create_engine
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from pydantic import BaseModel, EmailStr, constr, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 
 load_dotenv()
@@ -16,12 +17,35 @@ DATABASE_URL = (
     f"postgresql+psycopg2://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
     f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
 )
+# Sync engine for migrations, jobs/ and scripts; request handlers use async_engine
 engine = create_engine(
     DATABASE_URL,
     future=True,
     pool_pre_ping=True,
 )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+
+# Prepared statements are cached per connection; set DB_STATEMENT_CACHE_SIZE=0 behind pgbouncer in transaction mode
+STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 500))
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+    f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    f"?prepared_statement_cache_size={STATEMENT_CACHE_SIZE}"
+)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=int(os.getenv("DB_POOL_SIZE", 20)),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 10)),
+    pool_recycle=1800,
+    connect_args={
+        "statement_cache_size": STATEMENT_CACHE_SIZE,
+        # queries here are short index lookups, JIT compilation only adds latency
+        "server_settings": {"jit": "off"},
+    },
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 # Models
@@ -39,9 +63,13 @@ class Client(Base):
 
 class Meeting(Base):
     __tablename__ = "meetings"
+    __table_args__ = (
+        # serves the newest-first keyset listing, see helpers/meetings.py
+        Index("ix_meetings_client_created_at", "client_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid_lib.uuid4, index=True)
-    client_id = Column(String)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id", ondelete="CASCADE"))
     title = Column(String)
     interviewee_name = Column(String)
     interviewee_email = Column(String)
@@ -52,6 +80,57 @@ class Meeting(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
+class UserLogs(Base):
+    """Rows written by the desktop monitor (see app/models/db.py).
+
+    In Postgres the table is range-partitioned by day on `logged_at`, so the
+    primary key and the upsert key include it. Partitions are created and
+    dropped by jobs/user_logs_maintenance.py; schema changes go through
+    migrations/.
+    """
+    __tablename__ = "user_logs"
+    __table_args__ = (
+        UniqueConstraint("user_id", "meeting_id", "log_id", "logged_at", name="uq_user_logs_user_meeting_log"),
+        Index("ix_user_logs_meeting_logged_at", "meeting_id", "logged_at"),
+        Index("ix_user_logs_user_logged_at", "user_id", "logged_at"),
+        Index("ix_user_logs_fingerprint_logged_at", "user_fingerprint", "logged_at"),
+        {"postgresql_partition_by": "RANGE (logged_at)"},
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(String)
+    user_fingerprint = Column(String)
+    meeting_id = Column(String)
+    log_id = Column(Integer)
+    detector = Column(String)
+    log = Column(String)
+    activity_status = Column(String)
+    # a row stands for `repeat_count` identical results from logged_at to last_logged_at,
+    # see helpers/timeline.py
+    repeat_count = Column(Integer, nullable=False, server_default="1")
+    logged_at = Column(DateTime, primary_key=True)
+    last_logged_at = Column(DateTime)
+    created_at = Column(DateTime, server_default=func.now())
+
+class UserLogMinute(Base):
+    """Per-minute rollup of user_logs rows older than the raw retention window.
+
+    A row counts the checks (sum of repeat_count) of one detector with one
+    result that started in `minute`; last_logged_at is where the last of
+    their runs ended, which may be minutes later.
+    """
+    __tablename__ = "user_logs_minutely"
+
+    meeting_id = Column(String, primary_key=True)
+    user_id = Column(String, primary_key=True)
+    minute = Column(DateTime, primary_key=True)
+    detector = Column(String, primary_key=True, server_default="")
+    activity_status = Column(String, primary_key=True)
+    log = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+    first_logged_at = Column(DateTime, nullable=False)
+    last_logged_at = Column(DateTime, nullable=False)
+
 # Schemas
 PasswordStr = constr(min_length=8, max_length=128)
 
@@ -86,11 +165,94 @@ class APIResponse(BaseModel):
     errors: List[APIError] = []
     redirect: Optional[str] = None
 
-def get_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+class ClientSnapshot(BaseModel):
+    """Read-only copy of a Client row, safe to cache between requests."""
+    id: uuid_lib.UUID
+    first_name: str
+    last_name: str
+    email: str
+
+    class Config:
+        from_attributes = True
+        frozen = True
+
+class UserLogIn(BaseModel):
+    """One row of an ingestion batch, as written by the desktop monitor."""
+    user_id: constr(max_length=64)
+    user_fingerprint: Optional[constr(max_length=256)] = None
+    meeting_id: constr(max_length=64)
+    log_id: int
+    detector: Optional[constr(max_length=64)] = None
+    log: constr(max_length=2000)
+    activity_status: constr(max_length=16)
+    repeat_count: int = 1
+    logged_at: dt
+    last_logged_at: Optional[dt] = None
 
-Base.metadata.create_all(bind=engine)
+class IngestResult(BaseModel):
+    ok: bool
+    received: int = 0
+    inserted: int = 0
+    errors: List[APIError] = []
+
+class MeetingOut(BaseModel):
+    id: uuid_lib.UUID
+    title: Optional[str] = None
+    interviewee_name: Optional[str] = None
+    interviewee_email: Optional[str] = None
+    interviewer_name: Optional[str] = None
+    interviewer_email: Optional[str] = None
+    meeting_url: Optional[str] = None
+    created_at: dt
+
+    class Config:
+        from_attributes = True
+
+class DeviceMeeting(BaseModel):
+    """A meeting a device fingerprint showed up in."""
+    meeting: MeetingOut
+    first_seen_at: dt
+    last_seen_at: dt
+
+class MeetingPage(BaseModel):
+    items: List[MeetingOut]
+    next_cursor: Optional[str] = None
+
+class LogEntry(BaseModel):
+    id: int
+    log_id: Optional[int] = None
+    detector: Optional[str] = None
+    log: Optional[str] = None
+    activity_status: Optional[str] = None
+    repeat_count: int = 1
+    logged_at: dt
+    last_logged_at: Optional[dt] = None
+
+    class Config:
+        from_attributes = True
+
+class LogPage(BaseModel):
+    items: List[LogEntry]
+    next_cursor: Optional[str] = None
+
+class MeetingSummaryOut(BaseModel):
+    activity_status: Optional[str] = None
+    first_logged_at: Optional[dt] = None
+    last_logged_at: Optional[dt] = None
+    rows: int = 0
+    checks: Dict[str, int] = {}
+    status_seconds: Dict[str, float] = {}
+    detector_seconds: Dict[str, Dict[str, float]] = {}
+    detectors_fired: Dict[str, Dict[str, int]] = {}
+
+class TimelineInterval(BaseModel):
+    detector: Optional[str] = None
+    activity_status: Optional[str] = None
+    log: Optional[str] = None
+    started_at: dt
+    ended_at: dt
+    checks: int = 1
+
+async def get_session() -> AsyncSession:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -16,6 +16,12 @@ $(function () {
     $form.find('.alert').addClass('d-none').text('');
   }
 
+  // server-side message for non-2xx replies (e.g. 503 when sign-ins are queued up)
+  function failMessage(xhr) {
+    const errors = xhr && xhr.responseJSON && xhr.responseJSON.errors;
+    return errors && errors.length ? errors[0].message : 'Network error. Please try again.';
+  }
+
   function postJSON(url, data, csrfToken) {
     return $.ajax({
       url: url,
@@ -64,8 +70,8 @@ $(function () {
           });
         }
       })
-      .fail(function () {
-        $('#signupFormAlert').text('Network error. Please try again.').removeClass('d-none');
+      .fail(function (xhr) {
+        $('#signupFormAlert').text(failMessage(xhr)).removeClass('d-none');
       });
   });
 
@@ -102,8 +108,8 @@ $(function () {
           }
         }
       })
-      .fail(function () {
-        $('#signinFormAlert').text('Network error. Please try again.').removeClass('d-none');
+      .fail(function (xhr) {
+        $('#signinFormAlert').text(failMessage(xhr)).removeClass('d-none');
       });
   });
 
@@ -150,9 +156,9 @@ $(function () {
             });
         }
         },
-        error: function () {
+        error: function (xhr) {
         $('#accountSettingsAlert')
-            .text('Network error. Please try again.')
+            .text(failMessage(xhr))
             .removeClass('d-none');
         }
     });
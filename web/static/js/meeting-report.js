@@ -0,0 +1,69 @@
+$(function () {
+  const BADGES = { safe: 'bg-success', warning: 'bg-warning text-dark', danger: 'bg-danger' };
+
+  function capitalize(s) {
+    return s ? s.charAt(0).toUpperCase() + s.slice(1) : '';
+  }
+
+  function badge(status) {
+    return $('<span>').addClass('badge ' + (BADGES[status] || 'bg-secondary')).text(capitalize(status));
+  }
+
+  function formatTime(value) {
+    return (value || '').replace('T', ' ').slice(0, 19);
+  }
+
+  // ---- Timeline ----------------------------------------------------
+  // loaded after the page so the report does not wait for a full pass over the logs
+  const $timeline = $('#timeline');
+  if ($timeline.length) {
+    $.getJSON($timeline.data('timeline-url'))
+      .done(function (intervals) {
+        $timeline.empty();
+        if (!intervals.length) {
+          $('<tr>').append($('<td colspan="5" class="text-muted text-center">').text('No warnings')).appendTo($timeline);
+          return;
+        }
+        intervals.forEach(function (interval) {
+          const $tr = $('<tr>');
+          $('<td>').text(interval.detector || '-').appendTo($tr);
+          $('<td>').text(interval.log).appendTo($tr);
+          $('<td>').append(badge(interval.activity_status)).appendTo($tr);
+          $('<td>').text(formatTime(interval.started_at) + ' - ' + formatTime(interval.ended_at).slice(11)).appendTo($tr);
+          $('<td>').text(interval.checks).appendTo($tr);
+          $timeline.append($tr);
+        });
+      })
+      .fail(function () {
+        $timeline.empty();
+        $('<tr>').append($('<td colspan="5" class="text-danger text-center">').text('Could not load the timeline')).appendTo($timeline);
+      });
+  }
+
+  // ---- Live events -------------------------------------------------
+  const MAX_ROWS = 200;
+
+  const $tbody = $('#liveLogs');
+  const $status = $('#liveStatus');
+  if (!$tbody.length || !window.EventSource) return;
+
+  function setStatus(text, className) {
+    $status.attr('class', 'badge ' + className).text(text);
+  }
+
+  // EventSource reconnects by itself and sends Last-Event-ID, so missed rows are replayed
+  const source = new EventSource($tbody.data('events-url'));
+  source.onopen = function () { setStatus('Connected', 'bg-success'); };
+  source.onerror = function () { setStatus('Reconnecting', 'bg-secondary'); };
+
+  source.addEventListener('log', function (e) {
+    const row = JSON.parse(e.data);
+    const $tr = $('<tr>');
+    $('<td>').text(row.log_id).appendTo($tr);
+    $('<td>').text(row.log).appendTo($tr);
+    $('<td>').append(badge(row.activity_status)).appendTo($tr);
+    $('<td>').text(formatTime(row.logged_at)).appendTo($tr);
+    $tbody.prepend($tr);
+    $tbody.children().slice(MAX_ROWS).remove();
+  });
+});
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# models.db builds its engines from these at import; tests never connect
+for name, value in {"DB_HOST": "localhost", "DB_PORT": "5432", "DB_USER": "test", "DB_PASSWORD": "", "DB_NAME": "test"}.items():
+    os.environ.setdefault(name, value)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,27 @@
+from datetime import datetime
+import pytest
+from helpers import codec
+
+
+ROW = {
+    "user_id": "u", "user_fingerprint": None, "meeting_id": "m", "log_id": 1, "detector": "process",
+    "log": "ok", "activity_status": "safe", "repeat_count": 3,
+    "logged_at": datetime(2026, 10, 18, 9, 0), "last_logged_at": datetime(2026, 10, 18, 9, 5), "created_at": None,
+}
+
+
+def test_rows_round_trip():
+    assert codec.decode_rows(codec.encode_rows([ROW])) == [ROW]
+
+
+def test_varint_of_64_bits_is_read():
+    out = bytearray()
+    codec._write_varint(out, 2 ** 64 - 1)
+    assert len(out) == codec.MAX_VARINT_BYTES
+    assert codec._read_varint(bytes(out), 0) == (2 ** 64 - 1, len(out))
+
+
+def test_overlong_varint_is_rejected():
+    data = bytearray(codec.HEADER.pack(codec.MAGIC, codec.VERSION, 0, 0)) + b"\xff" * 100 + b"\x01"
+    with pytest.raises(codec.CodecError, match="Varint longer"):
+        codec.decode_batch(bytes(data))
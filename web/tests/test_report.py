@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from helpers.report import MeetingSummary
+
+
+START = datetime(2026, 10, 18, 9, 0)
+
+
+def row(id, detector, activity_status, at, until=None, count=1, log=None):
+    return SimpleNamespace(
+        id=id, detector=detector, activity_status=activity_status, log=log or f"{detector} {activity_status}",
+        repeat_count=count, logged_at=START + timedelta(seconds=at),
+        last_logged_at=START + timedelta(seconds=until if until is not None else at),
+    )
+
+
+# the browser watcher logs once; the process detector logs a change and then heartbeats
+ROWS = [
+    row(1, "browser", "safe", 0),
+    row(2, "process", "safe", 0),
+    row(3, "process", "safe", 1, until=300, count=300),
+    row(4, "process", "warning", 301),
+    row(5, "process", "warning", 302, until=600, count=299),
+]
+
+
+def summarize(rows):
+    summary = MeetingSummary()
+    for r in rows:
+        summary.fold(r)
+    return summary.as_dict()
+
+
+def test_change_only_detector_counts_until_the_meetings_last_log():
+    result = summarize(ROWS)
+    assert result["detector_seconds"]["browser"] == {"safe": 600}
+    assert result["detector_seconds"]["process"] == {"safe": 301, "warning": 299}
+
+
+def test_status_seconds_are_the_worst_status_over_time():
+    result = summarize(ROWS)
+    assert result["status_seconds"] == {"safe": 301, "warning": 299}
+    assert sum(result["status_seconds"].values()) == (result["last_logged_at"] - result["first_logged_at"]).total_seconds()
+    assert result["activity_status"] == "warning"
+
+
+def test_incremental_fold_matches_a_full_fold():
+    summary = MeetingSummary()
+    for r in ROWS[:3]:
+        summary.fold(r)
+    assert summary.can_fold(ROWS[3:])
+    for r in ROWS[3:]:
+        summary.fold(r)
+    assert summary.as_dict() == summarize(ROWS)
+
+
+def test_late_status_change_cannot_be_folded():
+    summary = MeetingSummary()
+    for r in ROWS:
+        summary.fold(r)
+    # a spooled browser change from before the process warning
+    assert not summary.can_fold([row(6, "browser", "warning", 200)])
+    # a heartbeat keeps its detector's status, so an early start is fine
+    assert summary.can_fold([row(6, "browser", "safe", 200, until=650, count=2)])
@@ -0,0 +1,16 @@
+import os
+import pytest
+
+
+REPO = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# modules the desktop app and the web service each ship a copy of
+SHARED_MODULES = ["helpers/codec.py", "helpers/profiler.py"]
+
+
+@pytest.mark.parametrize("module", SHARED_MODULES)
+def test_app_and_web_copies_match(module):
+    app_copy = os.path.join(REPO, "app", module)
+    if not os.path.exists(app_copy):
+        pytest.skip("app/ is not checked out next to web/")
+    with open(app_copy, "rb") as f, open(os.path.join(REPO, "web", module), "rb") as g:
+        assert f.read() == g.read(), f"app/{module} and web/{module} differ"